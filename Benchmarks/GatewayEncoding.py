@@ -0,0 +1,85 @@
+import json
+import sys
+import time
+import zlib
+
+from ..Core import ETF
+
+
+def sample_payloads():
+    user = {"id": "80351110224678912", "username": "Nelly", "discriminator": "0", "avatar": "8342729096ea3675442027381ff50dfe", "bot": False}
+    member = {"user": user, "nick": None, "roles": ["41771983423143936"], "joined_at": "2015-04-26T06:26:56.936000+00:00", "deaf": False, "mute": False}
+    channel = {"id": "41771983423143937", "type": 0, "name": "general", "position": 6, "parent_id": None, "nsfw": False, "permission_overwrites": []}
+    role = {"id": "41771983423143936", "name": "WE DEM BOYZZ!!!!!!", "color": 3447003, "hoist": True, "position": 1, "permissions": "66321471", "managed": False, "mentionable": False}
+
+    guild_create = {
+        "op": 0, "s": 2, "t": "GUILD_CREATE",
+        "d": {
+            "id": "41771983423143937", "name": "Discord Developers", "member_count": 1000,
+            "roles": [dict(role, id=str(41771983423143936 + i)) for i in range(50)],
+            "channels": [dict(channel, id=str(41771983423143937 + i), name=f"channel-{i}") for i in range(100)],
+            "members": [dict(member, user=dict(user, id=str(80351110224678912 + i))) for i in range(1000)],
+        }
+    }
+    ready = {
+        "op": 0, "s": 1, "t": "READY",
+        "d": {
+            "v": 10, "user": user, "session_id": "d5a7bc9c0b0e4ad7a0e0b1d2c3f4e5a6",
+            "resume_gateway_url": "wss://gateway-us-east1-b.discord.gg",
+            "guilds": [{"id": str(41771983423143937 + i), "unavailable": True} for i in range(2500)],
+            "application": {"id": "80351110224678912", "flags": 0},
+        }
+    }
+    message_create = {
+        "op": 0, "s": 3, "t": "MESSAGE_CREATE",
+        "d": {
+            "id": "334385199974967042", "channel_id": "41771983423143937", "guild_id": "41771983423143937",
+            "author": user, "member": member, "content": "Supa Hot", "timestamp": "2017-07-11T17:27:07.299000+00:00",
+            "edited_timestamp": None, "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [],
+            "attachments": [], "embeds": [], "pinned": False, "type": 0,
+        }
+    }
+    return [ready, guild_create] + [message_create] * 200
+
+
+def load_payloads(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def zlib_frames(frames):
+    compressor = zlib.compressobj()
+    return [compressor.compress(frame) + compressor.flush(zlib.Z_SYNC_FLUSH) for frame in frames]
+
+
+def run(name, frames, decode, compressed, rounds):
+    best = None
+    for _ in range(rounds):
+        inflator = zlib.decompressobj() if compressed else None
+        started = time.perf_counter()
+        for frame in frames:
+            decode(inflator.decompress(frame) if inflator else frame)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    size = sum(len(frame) for frame in frames)
+    per_frame = best / len(frames) * 1_000_000
+    print(f"{name:<16} {size:>12,} bytes {best * 1000:>10.2f} ms {per_frame:>10.1f} us/frame")
+
+
+def main(argv):
+    payloads = load_payloads(argv[0]) if argv else sample_payloads()
+    rounds = int(argv[1]) if len(argv) > 1 else 5
+
+    json_frames = [json.dumps(payload).encode("utf-8") for payload in payloads]
+    etf_frames = [ETF.encode(payload) for payload in payloads]
+
+    print(f"{len(payloads)} payloads, best of {rounds} rounds")
+    run("json", json_frames, json.loads, False, rounds)
+    run("json+zlib", zlib_frames(json_frames), json.loads, True, rounds)
+    run("etf", etf_frames, ETF.decode, False, rounds)
+    run("etf+zlib", zlib_frames(etf_frames), ETF.decode, True, rounds)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,139 @@
+import gc
+import sys
+import time
+import tracemalloc
+
+from ..Resources.Message import Message
+from .GatewayEncoding import sample_payloads
+
+
+# Copy of the Message model before it moved to __slots__ and lazy field access, kept for comparison.
+class LegacyMessage:
+    REQUIRED_FIELDS = ("id", "channel_id", "author", "content", "timestamp")
+    PAYLOAD_FIELDS = frozenset((
+        "id", "channel_id", "author", "content", "timestamp", "edited_timestamp", "tts",
+        "mention_everyone", "mentions", "mention_roles", "mention_channels", "attachments",
+        "embeds", "reactions", "nonce", "pinned", "webhook_id", "type", "activity",
+        "application", "application_id", "flags", "message_reference", "message_snapshots",
+        "referenced_message", "interaction_metadata", "interaction", "thread", "components",
+        "sticker_items", "stickers", "position", "role_subscription_data", "resolved", "call"
+    ))
+
+    def __init__(self, client, id, channel_id, author, content, timestamp, edited_timestamp=None, tts=False, 
+                 mention_everyone=False, mentions=None, mention_roles=None, mention_channels=None, 
+                 attachments=None, embeds=None, reactions=None, nonce=None, pinned=False, 
+                 webhook_id=None, type=0, activity=None, application=None, application_id=None, 
+                 flags=None, message_reference=None, message_snapshots=None, referenced_message=None, 
+                 interaction_metadata=None, interaction=None, thread=None, components=None, 
+                 sticker_items=None, stickers=None, position=None, role_subscription_data=None, 
+                 resolved=None, call=None):
+        self.client = client
+        self.id = id
+        self.channel_id = channel_id
+        self.author = author
+        self.content = content
+        self.timestamp = timestamp
+        self.edited_timestamp = edited_timestamp
+        self.tts = tts
+        self.mention_everyone = mention_everyone
+        self.mentions = mentions if mentions is not None else []
+        self.mention_roles = mention_roles if mention_roles is not None else []
+        self.mention_channels = mention_channels if mention_channels is not None else []
+        self.attachments = attachments if attachments is not None else []
+        self.embeds = embeds if embeds is not None else []
+        self.reactions = reactions if reactions is not None else []
+        self.nonce = nonce
+        self.pinned = pinned
+        self.webhook_id = webhook_id
+        self.type = type
+        self.activity = activity
+        self.application = application
+        self.application_id = application_id
+        self.flags = flags
+        self.message_reference = message_reference
+        self.message_snapshots = message_snapshots if message_snapshots is not None else []
+        self.referenced_message = referenced_message
+        self.interaction_metadata = interaction_metadata
+        self.interaction = interaction
+        self.thread = thread
+        self.components = components if components is not None else []
+        self.sticker_items = sticker_items if sticker_items is not None else []
+        self.stickers = stickers if stickers is not None else []
+        self.position = position
+        self.role_subscription_data = role_subscription_data
+        self.resolved = resolved
+        self.call = call
+
+    @classmethod
+    def from_payload(cls, client, data):
+        fields = dict.fromkeys(cls.REQUIRED_FIELDS)
+        fields.update((key, value) for key, value in data.items() if key in cls.PAYLOAD_FIELDS)
+        return cls(client, **fields)
+
+
+def message_payloads(count):
+    template = next(payload["d"] for payload in sample_payloads() if payload.get("t") == "MESSAGE_CREATE")
+    reply = dict(template, id="334385199974967041", content="Reply target")
+    payloads = []
+    for index in range(count):
+        payload = dict(template, id=str(334385199974967042 + index))
+        if index % 10 == 0:
+            payload["referenced_message"] = reply
+            payload["embeds"] = [{"title": "Embed", "description": "Description"}]
+        payloads.append(payload)
+    return payloads
+
+
+def construction(name, factory, payloads, rounds):
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for payload in payloads:
+            factory(None, payload)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    per_message = best / len(payloads) * 1_000_000_000
+    print(f"{name:<10} construct {best * 1000:>10.2f} ms {per_message:>10.0f} ns/message")
+
+
+def access(name, messages, rounds):
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for message in messages:
+            message.content
+            message.author
+            message.embeds
+            message.mentions
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    per_message = best / len(messages) * 1_000_000_000
+    print(f"{name:<10} access    {best * 1000:>10.2f} ms {per_message:>10.0f} ns/message")
+
+
+def memory(name, factory, payloads):
+    # Payloads are allocated beforehand, so only the model objects are measured.
+    gc.collect()
+    tracemalloc.start()
+    messages = [factory(None, payload) for payload in payloads]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{name:<10} memory    {size:>12,} bytes {size / len(payloads):>10.0f} B/message")
+    return messages
+
+
+def main(argv):
+    count = int(argv[0]) if argv else 100_000
+    rounds = int(argv[1]) if len(argv) > 1 else 5
+    payloads = message_payloads(count)
+
+    print(f"{count} messages, best of {rounds} rounds")
+    for name, factory in (("legacy", LegacyMessage.from_payload), ("slots", Message.from_payload)):
+        construction(name, factory, payloads, rounds)
+        messages = memory(name, factory, payloads)
+        access(name, messages, rounds)
+        del messages
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
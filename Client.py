@@ -1,88 +1,147 @@
 import asyncio
-import aiohttp
+import logging
 
 from .Core.CommandHandler import CommandHandler
 from .Core.InteractionHandler import InteractionHandler
 from .Core.WebSocket import WebSocketManager
+from .Core.ShardManager import ShardManager
+from .Core.Cluster import ClusterSupervisor
+from .Core.SessionStore import SessionStore
 from .Core.APIHelper import APIHelper
+from .Core.HTTPClient import HTTPClient
+from .Core.JSONCodec import JSONCodec
+from .Core.Tracing import Tracer
+from .Core.EventBus import EventBus
+from .Core.Cache import StateCache, CachePolicy
+from .Core.MemberRequests import MemberRequests
 from .Core.Decorators import CommandDecorator
 from .Core.Intents import Intents
 from .Core.CommandRegistration import CommandRegistration
 
 class Client:
-    def __init__(self, token, application_id, shard_id=0, total_shards=1, intents=Intents.default):
+    def __init__(self, token, application_id, shard_id=None, total_shards=None, intents=Intents.default, compress=False, encoding="json", json_backend=None, tracer=None, shard_ids=None, session_store=None, cache_policy=None, command_manifest=None):
         self.token = token
         self.application_id = application_id
         self.shard_id = shard_id
         self.base_url = "https://discord.com/api/v10"
-        self.gateway_url = "wss://gateway.discord.gg/?v=10&encoding=json"
+        self.compress = compress
+        self.encoding = encoding
+        self.codec = JSONCodec(json_backend)
+        self.tracer = tracer or Tracer()
+        self.logger = logging.getLogger("PaulCord")
+        self.session_store = SessionStore(session_store) if isinstance(session_store, str) else session_store
+        self.command_manifest = command_manifest
+        self.gateway_url = self.build_gateway_url("wss://gateway.discord.gg")
         self.session = None
-        self.ws = None
-        self.sequence = None
-        self.heartbeat_interval = None
         self.running = True
         self.commands = []
         self.component_handlers = {}
-        self.last_heartbeat_ack = True
-        self.session_id = None
         self.reconnect_attempts = 0
-        self.intents = intents
+        self.intents = intents() if callable(intents) else intents
         self.total_shards = total_shards
-        self.events = {}
+        if shard_ids is None and shard_id is not None:
+            shard_ids = [shard_id]
+        self.events = EventBus(self)
+        self.cache = StateCache(self, cache_policy or CachePolicy())
+        self.member_requests = MemberRequests(self)
 
+        self.http = HTTPClient(self)
         self.command_handler = CommandHandler(self)
         self.interaction_handler = InteractionHandler(self)
-        self.websocket_manager = WebSocketManager(self)
+        self.websocket_manager = WebSocketManager(self, shard_ids[0] if shard_ids else 0, total_shards or 1)
+        self.shard_manager = ShardManager(self, shard_ids, total_shards)
+        self.cluster = None
         self.command_decorator = CommandDecorator(self)
         self.api_helper = APIHelper(self)
         self.command_registration = CommandRegistration(self)
 
+    @property
+    def ws(self):
+        return self.websocket_manager.ws
+
+    @property
+    def sequence(self):
+        return self.websocket_manager.sequence
+
+    @property
+    def session_id(self):
+        return self.websocket_manager.session_id
+
+    @property
+    def heartbeat_interval(self):
+        return self.websocket_manager.heartbeat_interval
+
+    @property
+    def last_heartbeat_ack(self):
+        return self.websocket_manager.last_heartbeat_ack
+
+    @property
+    def latency(self):
+        return self.websocket_manager.latency
+
+    @property
+    def shards(self):
+        return self.shard_manager.shards
+
+    def build_gateway_url(self, base_url):
+        url = f"{base_url.rstrip('/')}/?v=10&encoding={self.encoding}"
+        if self.compress:
+            url += "&compress=zlib-stream"
+        return url
+
     async def dispatch_event(self, event_name, *args, **kwargs):
-        event_handler = self.events.get(event_name)
-        if event_handler:
-            print(f"Dispatching event: {event_name} with args: {args} kwargs: {kwargs}")
-            try:
-                await event_handler(*args, **kwargs)
-            except Exception as e:
-                print(f"Error while dispatching event '{event_name}': {e}")
-        else:
-            print(f"No handler found for event: {event_name}")
+        self.events.dispatch(event_name, *args, **kwargs)
+
+    def event(self, func=None, *, name=None, once=False):
+        if func is None:
+            return lambda f: self.events.add_listener(f, name, once)
+        return self.events.add_listener(func, name, once)
+
+    def add_listener(self, func, name=None, once=False):
+        return self.events.add_listener(func, name, once)
 
-    def event(self, func):  
-        self.events[func.__name__] = func
-        return func
+    def remove_listener(self, func, name=None):
+        self.events.remove_listener(func, name)
 
-    def slash_commands(self, name=None, description=None, options=None):
-        return self.command_decorator.slash_commands(name, description, options)
+    async def wait_for(self, event, check=None, timeout=None):
+        return await self.events.wait_for(event, check, timeout)
+
+    def slash_commands(self, name=None, description=None, options=None, integration_types=False, guild_ids=None):
+        return self.command_decorator.slash_commands(name, description, options, integration_types, guild_ids)
 
     async def load_commands(self):
         print("Starting command registration and sync.")
         print(f"Commands before registration: {self.commands}")
 
-        try:
-            await self.command_registration.register_commands()
-            print("Commands registered successfully.")
-        except Exception as e:
-            print(f"Error during command registration: {e}")
-
         try:
             await self.command_registration.sync_commands()
             print("Commands synchronized successfully.")
         except Exception as e:
             print(f"Error during command synchronization: {e}")
 
-    async def run_async(self):
-        self.session = aiohttp.ClientSession()
-        
-        await self.load_commands()
+        try:
+            await self.command_registration.sync_guild_commands()
+        except Exception as e:
+            print(f"Error during guild command synchronization: {e}")
+
+    async def run_async(self, load_commands=True):
+        self.session = await self.http.start()
+        await self.http.warm_up()
+
+        if load_commands:
+            await self.load_commands()
         
         try:
-            await self.websocket_manager.connect()
+            await self.shard_manager.start()
             print("WebSocket connection established.")
         except Exception as e:
             print(f"Error during WebSocket connection: {e}")
 
-        await self.session.close()
+        await self.http.close()
+        self.session = None
 
-    def run(self):
-        asyncio.run(self.run_async())
+    def run(self, clusters=None, shards_per_cluster=None):
+        if clusters or shards_per_cluster:
+            ClusterSupervisor(self, clusters, shards_per_cluster).run()
+        else:
+            asyncio.run(self.run_async())
@@ -1,4 +1,3 @@
-import aiohttp
 import logging
 from typing import Optional, Dict, Any
 from rich.console import Console
@@ -30,15 +29,15 @@ class APIHelper:
         if components:
             json_data["data"]["components"] = components
 
-        self.logger.info(f"Sending interaction response: {json_data}")
-
-        session_provided = hasattr(self.client, "session") and self.client.session is not None
-        session = self.client.session if session_provided else aiohttp.ClientSession()
+        trace = self.client.tracer.interactions
+        if trace:
+            trace.debug("Sending interaction response", id=interaction_id, payload=lambda: json_data)
 
         try:
-            async with session.post(url, json=json_data) as response:
+            async with self.client.http.post(url, json=json_data) as response:
                 if 200 <= response.status < 300:
-                    self.console.print(f"[green]Interaction response sent successfully for interaction {interaction_id}[/green]")
+                    if trace:
+                        trace.info("Interaction response sent for interaction %s", interaction_id)
                 else:
                     text = await response.text()
                     self.logger.error(f"Failed to send interaction response: {response.status} {text}")
@@ -46,6 +45,25 @@ class APIHelper:
         except Exception as e:
             self.logger.exception(f"Exception while sending interaction response: {e}")
             self.console.print(f"[red]Exception while sending interaction response: {e}[/red]")
-        finally:
-            if not session_provided:
-                await session.close()
+
+    async def update_guild_command(self, command: Dict[str, Any], guild_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        registration = self.client.command_registration
+        url = registration.commands_url(guild_id)
+        payload = registration.build_payload(command, guild_scoped=guild_id is not None)
+        headers = {
+            "Authorization": f"Bot {self.client.token}",
+            "Content-Type": "application/json"
+        }
+
+        try:
+            async with self.client.http.post(url, headers=headers, json=payload) as response:
+                if response.status in (200, 201):
+                    self.console.print(f"[green]Command '{command['name']}' updated{f' in guild {guild_id}' if guild_id else ''}.[/green]")
+                    return await response.json(loads=self.client.codec.loads)
+                text = await response.text()
+                self.logger.error(f"Failed to update command '{command['name']}': {response.status} {text}")
+                self.console.print(f"[red]Failed to update command '{command['name']}': {response.status} {text}[/red]")
+        except Exception as e:
+            self.logger.exception(f"Exception while updating command '{command['name']}': {e}")
+            self.console.print(f"[red]Exception while updating command '{command['name']}': {e}[/red]")
+        return None
@@ -0,0 +1,461 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .MessageCache import MessageCache
+
+
+class CachedModel:
+    __slots__ = ()
+    FIELDS: tuple = ()
+    SNOWFLAKES = frozenset(("id",))
+    SNOWFLAKE_LISTS = frozenset()
+
+    def __init__(self, data: dict, fields: Optional[tuple] = None) -> None:
+        for field in self.FIELDS:
+            setattr(self, field, None)
+        self.update(data, fields)
+
+    def update(self, data: dict, fields: Optional[tuple] = None) -> None:
+        for field in fields or self.FIELDS:
+            if field not in data:
+                continue
+            value = data[field]
+            if value is not None:
+                if field in self.SNOWFLAKES:
+                    value = int(value)
+                elif field in self.SNOWFLAKE_LISTS:
+                    value = tuple(int(item) for item in value)
+            setattr(self, field, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is None:
+                continue
+            if field in self.SNOWFLAKES:
+                value = str(value)
+            elif field in self.SNOWFLAKE_LISTS:
+                value = [str(item) for item in value]
+            result[field] = value
+        return result
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} id={getattr(self, 'id', None)}>"
+
+
+class CachedRole(CachedModel):
+    FIELDS = (
+        "id", "name", "color", "hoist", "icon", "unicode_emoji", "position",
+        "permissions", "managed", "mentionable", "flags"
+    )
+    __slots__ = FIELDS
+
+
+class CachedChannel(CachedModel):
+    FIELDS = (
+        "id", "type", "guild_id", "position", "name", "topic", "nsfw", "last_message_id",
+        "bitrate", "user_limit", "rate_limit_per_user", "parent_id", "permission_overwrites", "flags"
+    )
+    SNOWFLAKES = frozenset(("id", "guild_id", "last_message_id", "parent_id"))
+    __slots__ = FIELDS
+
+
+class CachedMember(CachedModel):
+    FIELDS = (
+        "nick", "avatar", "roles", "joined_at", "premium_since", "deaf", "mute",
+        "flags", "pending", "communication_disabled_until", "status", "activities"
+    )
+    USER_FIELDS = {
+        "username": "username",
+        "global_name": "global_name",
+        "discriminator": "discriminator",
+        "user_avatar": "avatar",
+        "bot": "bot",
+    }
+    SNOWFLAKES = frozenset()
+    SNOWFLAKE_LISTS = frozenset(("roles",))
+    __slots__ = FIELDS + ("id",) + tuple(USER_FIELDS)
+
+    def __init__(self, data: dict, fields: Optional[tuple] = None) -> None:
+        self.id = None
+        for field in self.USER_FIELDS:
+            setattr(self, field, None)
+        super().__init__(data, fields)
+
+    def update(self, data: dict, fields: Optional[tuple] = None) -> None:
+        super().update(data, fields)
+        user = data.get("user")
+        if user:
+            self.id = int(user["id"])
+            for field, key in self.USER_FIELDS.items():
+                if key in user and (fields is None or field in fields):
+                    setattr(self, field, user[key])
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = super().to_dict()
+        user = {"id": str(self.id)}
+        for field, key in self.USER_FIELDS.items():
+            value = getattr(self, field)
+            if value is not None:
+                user[key] = value
+        result["user"] = user
+        return result
+
+
+class CachedGuild(CachedModel):
+    FIELDS = (
+        "id", "name", "icon", "splash", "banner", "description", "owner_id", "afk_channel_id",
+        "afk_timeout", "verification_level", "default_message_notifications",
+        "explicit_content_filter", "features", "mfa_level", "system_channel_id",
+        "rules_channel_id", "vanity_url_code", "premium_tier", "premium_subscription_count",
+        "preferred_locale", "member_count", "nsfw_level", "unavailable"
+    )
+    SNOWFLAKES = frozenset(("id", "owner_id", "afk_channel_id", "system_channel_id", "rules_channel_id"))
+    __slots__ = FIELDS + ("roles", "members", "channel_ids")
+
+    def __init__(self, data: dict, fields: Optional[tuple] = None) -> None:
+        self.roles: Dict[int, CachedRole] = {}
+        self.members: Dict[int, CachedMember] = {}
+        self.channel_ids: Set[int] = set()
+        super().__init__(data, fields)
+
+    def update(self, data: dict, fields: Optional[tuple] = None) -> None:
+        super().update(data, fields)
+        if "roles" in data:
+            self.roles = {int(role["id"]): CachedRole(role) for role in data["roles"]}
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = super().to_dict()
+        result["roles"] = [role.to_dict() for role in self.roles.values()]
+        return result
+
+
+MEMBER_FIELDS = CachedMember.FIELDS + tuple(CachedMember.USER_FIELDS)
+PRESENCE_FIELDS = ("status", "activities")
+
+
+class CachePolicy:
+    def __init__(
+        self,
+        guilds: bool = True,
+        channels: bool = True,
+        roles: bool = True,
+        members: bool = True,
+        presences: bool = False,
+        member_fields: Optional[Iterable[str]] = None,
+        max_members: Optional[int] = None,
+        member_ttl: Optional[float] = None,
+        max_messages: int = 1000,
+        messages_per_channel: int = 100
+    ) -> None:
+        if max_members is not None and max_members < 1:
+            raise ValueError("max_members must be at least 1")
+        if member_ttl is not None and member_ttl <= 0:
+            raise ValueError("member_ttl must be positive")
+        if max_messages < 0 or messages_per_channel < 1:
+            raise ValueError("max_messages must not be negative and messages_per_channel must be at least 1")
+
+        self.guilds = guilds
+        self.channels = channels
+        self.roles = roles and guilds
+        self.members = members and guilds
+        self.presences = presences and self.members
+        self.max_members = max_members
+        self.member_ttl = member_ttl
+        self.max_messages = max_messages
+        self.messages_per_channel = messages_per_channel
+
+        if member_fields is None:
+            member_fields = MEMBER_FIELDS if self.presences else tuple(
+                field for field in MEMBER_FIELDS if field not in PRESENCE_FIELDS
+            )
+        unknown = set(member_fields) - set(MEMBER_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown member fields: {', '.join(sorted(unknown))}")
+        self.member_fields = tuple(member_fields)
+        self.presence_fields = tuple(
+            field for field in PRESENCE_FIELDS if self.presences and field in self.member_fields
+        )
+
+    @classmethod
+    def none(cls) -> "CachePolicy":
+        return cls(guilds=False, channels=False, roles=False, members=False, max_messages=0)
+
+    @property
+    def evicts_members(self) -> bool:
+        return self.max_members is not None or self.member_ttl is not None
+
+    def __repr__(self) -> str:
+        enabled = [name for name in ("guilds", "channels", "roles", "members", "presences") if getattr(self, name)]
+        return (
+            f"<CachePolicy {'+'.join(enabled) or 'none'} max_members={self.max_members} "
+            f"member_ttl={self.member_ttl} max_messages={self.max_messages}>"
+        )
+
+
+class StateCache:
+    def __init__(self, client, policy: Optional[CachePolicy] = None) -> None:
+        self.client = client
+        self.policy = policy or CachePolicy()
+        self.guilds: Dict[int, CachedGuild] = {}
+        self.channels: Dict[int, CachedChannel] = {}
+        self.messages = MessageCache(client, self.policy.max_messages, self.policy.messages_per_channel)
+        self.member_usage: "OrderedDict[Tuple[int, int], float]" = OrderedDict()
+        self.counters = {
+            kind: {"hits": 0, "misses": 0, "evictions": 0}
+            for kind in ("guilds", "channels", "members")
+        }
+        self.logger = logging.getLogger("StateCache")
+        self.handlers: Dict[str, Callable[[dict], None]] = {
+            "GUILD_CREATE": self.guild_create,
+            "GUILD_UPDATE": self.guild_update,
+            "GUILD_DELETE": self.guild_delete,
+            "CHANNEL_CREATE": self.channel_update,
+            "CHANNEL_UPDATE": self.channel_update,
+            "CHANNEL_DELETE": self.channel_delete,
+            "GUILD_ROLE_CREATE": self.role_update,
+            "GUILD_ROLE_UPDATE": self.role_update,
+            "GUILD_ROLE_DELETE": self.role_delete,
+            "GUILD_MEMBER_ADD": self.member_add,
+            "GUILD_MEMBER_UPDATE": self.member_update,
+            "GUILD_MEMBER_REMOVE": self.member_remove,
+            "PRESENCE_UPDATE": self.presence_update,
+            "MESSAGE_CREATE": self.messages.message_create,
+            "MESSAGE_UPDATE": self.messages.message_update,
+            "MESSAGE_DELETE": self.messages.message_delete,
+            "MESSAGE_DELETE_BULK": self.messages.message_delete_bulk,
+        }
+
+    def apply(self, event_type: str, payload: Any) -> None:
+        handler = self.handlers.get(event_type)
+        if handler is None or not isinstance(payload, dict):
+            return
+        try:
+            handler(payload)
+        except Exception as e:
+            self.logger.error(f"Failed to apply {event_type} to the cache: {e}")
+
+    def clear(self) -> None:
+        self.guilds.clear()
+        self.channels.clear()
+        self.messages.clear()
+        self.member_usage.clear()
+
+    def count(self, kind: str, hit: bool) -> None:
+        self.counters[kind]["hits" if hit else "misses"] += 1
+
+    def get_guild(self, guild_id) -> Optional[CachedGuild]:
+        guild = self.guilds.get(int(guild_id))
+        self.count("guilds", guild is not None)
+        return guild
+
+    def get_channel(self, channel_id) -> Optional[CachedChannel]:
+        channel = self.channels.get(int(channel_id))
+        self.count("channels", channel is not None)
+        return channel
+
+    def get_role(self, guild_id, role_id) -> Optional[CachedRole]:
+        guild = self.guilds.get(int(guild_id))
+        return guild.roles.get(int(role_id)) if guild else None
+
+    def get_member(self, guild_id, user_id) -> Optional[CachedMember]:
+        key = (int(guild_id), int(user_id))
+        guild = self.guilds.get(key[0])
+        member = guild.members.get(key[1]) if guild else None
+
+        if member is not None and self.policy.evicts_members:
+            now = time.monotonic()
+            if self.policy.member_ttl is not None and self.member_usage.get(key, now) <= now - self.policy.member_ttl:
+                self.evict_member(key)
+                member = None
+            else:
+                self.touch_member(key, now)
+
+        self.count("members", member is not None)
+        return member
+
+    def guild_channels(self, guild_id) -> Optional[List[CachedChannel]]:
+        guild = self.guilds.get(int(guild_id))
+        if guild is None or guild.unavailable or not self.policy.channels:
+            self.count("channels", False)
+            return None
+        self.count("channels", True)
+        return [self.channels[channel_id] for channel_id in guild.channel_ids if channel_id in self.channels]
+
+    def add_member(self, guild_id, data: dict) -> Optional[CachedMember]:
+        guild = self.guilds.get(int(guild_id))
+        if guild is None or not self.policy.members or not data.get("user"):
+            return None
+
+        user_id = int(data["user"]["id"])
+        member = guild.members.get(user_id)
+        if member is None:
+            member = guild.members[user_id] = CachedMember(data, self.policy.member_fields)
+        else:
+            member.update(data, self.policy.member_fields)
+
+        if self.policy.evicts_members:
+            now = time.monotonic()
+            self.touch_member((guild.id, user_id), now)
+            self.expire_members(now)
+        return member
+
+    def touch_member(self, key: Tuple[int, int], now: float) -> None:
+        self.member_usage[key] = now
+        self.member_usage.move_to_end(key)
+
+    def expire_members(self, now: float) -> None:
+        usage = self.member_usage
+        ttl = self.policy.member_ttl
+        if ttl is not None:
+            while usage and next(iter(usage.values())) <= now - ttl:
+                self.evict_member(next(iter(usage)))
+        max_members = self.policy.max_members
+        if max_members is not None:
+            while len(usage) > max_members:
+                self.evict_member(next(iter(usage)))
+
+    def evict_member(self, key: Tuple[int, int]) -> None:
+        self.member_usage.pop(key, None)
+        guild = self.guilds.get(key[0])
+        if guild is not None and guild.members.pop(key[1], None) is not None:
+            self.counters["members"]["evictions"] += 1
+
+    def forget_member(self, guild: CachedGuild, user_id: int) -> None:
+        guild.members.pop(user_id, None)
+        self.member_usage.pop((guild.id, user_id), None)
+
+    def store_channel(self, data: dict, guild_id: Optional[int] = None) -> CachedChannel:
+        channel_id = int(data["id"])
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            channel = self.channels[channel_id] = CachedChannel(data)
+        else:
+            channel.update(data)
+        if guild_id is not None:
+            channel.guild_id = guild_id
+        return channel
+
+    def guild_create(self, data: dict) -> None:
+        if not self.policy.guilds:
+            return
+        guild_id = int(data["id"])
+        guild = self.guilds.get(guild_id)
+        if guild is None:
+            guild = self.guilds[guild_id] = CachedGuild(data)
+        else:
+            guild.update(data)
+        guild.unavailable = data.get("unavailable", False)
+        if not self.policy.roles:
+            guild.roles.clear()
+
+        if "channels" in data and self.policy.channels:
+            for channel_id in guild.channel_ids:
+                self.channels.pop(channel_id, None)
+            guild.channel_ids = {
+                self.store_channel(channel, guild_id).id for channel in data["channels"]
+            }
+        for member in data.get("members", ()):
+            self.add_member(guild_id, member)
+        for presence in data.get("presences", ()):
+            self.presence_update(presence, guild_id)
+
+    def guild_update(self, data: dict) -> None:
+        guild = self.guilds.get(int(data["id"]))
+        if guild is not None:
+            guild.update(data)
+            if not self.policy.roles:
+                guild.roles.clear()
+
+    def guild_delete(self, data: dict) -> None:
+        guild_id = int(data["id"])
+        if data.get("unavailable"):
+            guild = self.guilds.get(guild_id)
+            if guild is not None:
+                guild.unavailable = True
+            return
+        guild = self.guilds.pop(guild_id, None)
+        if guild is not None:
+            for channel_id in guild.channel_ids:
+                self.channels.pop(channel_id, None)
+                self.messages.clear_channel(channel_id)
+            for user_id in guild.members:
+                self.member_usage.pop((guild_id, user_id), None)
+
+    def channel_update(self, data: dict) -> None:
+        if not self.policy.channels:
+            return
+        channel = self.store_channel(data)
+        guild = self.guilds.get(channel.guild_id) if channel.guild_id else None
+        if guild is not None:
+            guild.channel_ids.add(channel.id)
+
+    def channel_delete(self, data: dict) -> None:
+        self.messages.clear_channel(data["id"])
+        channel = self.channels.pop(int(data["id"]), None)
+        if channel is not None and channel.guild_id:
+            guild = self.guilds.get(channel.guild_id)
+            if guild is not None:
+                guild.channel_ids.discard(channel.id)
+
+    def role_update(self, data: dict) -> None:
+        guild = self.guilds.get(int(data["guild_id"]))
+        if guild is None or not self.policy.roles:
+            return
+        role_id = int(data["role"]["id"])
+        role = guild.roles.get(role_id)
+        if role is None:
+            guild.roles[role_id] = CachedRole(data["role"])
+        else:
+            role.update(data["role"])
+
+    def role_delete(self, data: dict) -> None:
+        guild = self.guilds.get(int(data["guild_id"]))
+        if guild is not None:
+            guild.roles.pop(int(data["role_id"]), None)
+
+    def member_add(self, data: dict) -> None:
+        guild = self.guilds.get(int(data["guild_id"]))
+        if guild is None:
+            return
+        if guild.member_count is not None:
+            guild.member_count += 1
+        self.add_member(guild.id, data)
+
+    def member_update(self, data: dict) -> None:
+        self.add_member(data["guild_id"], data)
+
+    def member_remove(self, data: dict) -> None:
+        guild = self.guilds.get(int(data["guild_id"]))
+        if guild is None:
+            return
+        if guild.member_count:
+            guild.member_count -= 1
+        self.forget_member(guild, int(data["user"]["id"]))
+
+    def members_chunk(self, data: dict) -> None:
+        for member in data.get("members", ()):
+            self.add_member(data["guild_id"], member)
+        for presence in data.get("presences", ()):
+            self.presence_update(presence, data["guild_id"])
+
+    def presence_update(self, data: dict, guild_id=None) -> None:
+        if not self.policy.presence_fields:
+            return
+        guild = self.guilds.get(int(guild_id or data["guild_id"]))
+        member = guild.members.get(int(data["user"]["id"])) if guild else None
+        if member is not None:
+            member.update(data, self.policy.presence_fields)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "guilds": len(self.guilds),
+            "channels": len(self.channels),
+            "roles": sum(len(guild.roles) for guild in self.guilds.values()),
+            "members": sum(len(guild.members) for guild in self.guilds.values()),
+            "counters": {kind: dict(counters) for kind, counters in self.counters.items()},
+            "messages": self.messages.stats(),
+        }
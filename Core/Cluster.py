@@ -0,0 +1,411 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from multiprocessing.connection import wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+IDENTIFY_INTERVAL = 5.0
+REQUEST_TIMEOUT = 30.0
+
+
+def split_shards(total_shards: int, clusters: int) -> List[List[int]]:
+    clusters = max(1, min(clusters, total_shards))
+    size, extra = divmod(total_shards, clusters)
+    ranges = []
+    start = 0
+    for index in range(clusters):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+class ClusterIdentifyLimiter:
+    def __init__(self, connection: "ClusterConnection") -> None:
+        self.connection = connection
+
+    async def acquire(self, shard_id: int) -> None:
+        # Waits behind every other queued identify, so there is no fixed upper bound.
+        await self.connection.request("identify", timeout=None, shard_id=shard_id)
+
+
+class ClusterConnection:
+    def __init__(self, client, cluster_id: int, shard_ids: List[int], clusters: List[List[int]], total_shards: int, conn) -> None:
+        self.client = client
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.clusters = clusters
+        self.total_shards = total_shards
+        self.conn = conn
+        self.nonces = itertools.count()
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.handlers: Dict[str, Callable] = {"status": self.handle_status}
+        self.identify_limiter = ClusterIdentifyLimiter(self)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.logger = logging.getLogger(f"Cluster_{cluster_id}")
+
+    def cluster_for_guild(self, guild_id) -> int:
+        shard_id = (int(guild_id) >> 22) % self.total_shards
+        for cluster_id, shard_ids in enumerate(self.clusters):
+            if shard_id in shard_ids:
+                return cluster_id
+        return -1
+
+    def send(self, message: Dict[str, Any]) -> None:
+        self.conn.send(message)
+
+    async def request(self, op: str, timeout: Optional[float] = REQUEST_TIMEOUT, **data) -> Any:
+        nonce = next(self.nonces)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[nonce] = future
+        try:
+            self.send({"op": op, "nonce": nonce, "cluster_id": self.cluster_id, "d": data})
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.pending.pop(nonce, None)
+
+    async def guild_cluster(self, guild_id) -> int:
+        return await self.request("guild_cluster", guild_id=str(guild_id))
+
+    async def status(self, timeout: float = 10) -> Dict[int, Any]:
+        return await self.request("status", timeout=timeout)
+
+    async def query(self, query: str, timeout: float = 10, **data) -> Dict[int, Any]:
+        return await self.request("query", timeout=timeout, query=query, **data)
+
+    def broadcast(self, **data) -> None:
+        self.send({"op": "broadcast", "cluster_id": self.cluster_id, "d": data})
+
+    def relay_global_pause(self, retry_after: float) -> None:
+        try:
+            self.send({"op": "global_pause", "cluster_id": self.cluster_id, "d": {"retry_after": retry_after}})
+        except (BrokenPipeError, OSError) as e:
+            self.logger.error(f"Failed to relay global rate limit to the supervisor: {e}")
+
+    def add_handler(self, op: str, handler: Callable) -> None:
+        self.handlers[op] = handler
+
+    async def handle_status(self, data: Dict[str, Any]) -> Dict[int, Any]:
+        return self.client.shard_manager.status()
+
+    def read(self) -> None:
+        while True:
+            try:
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                self.call_soon(self.disconnected)
+                return
+            if not self.call_soon(lambda message=message: asyncio.create_task(self.handle_message(message))):
+                return
+
+    def call_soon(self, callback: Callable) -> bool:
+        try:
+            self.loop.call_soon_threadsafe(callback)
+            return True
+        except RuntimeError:
+            return False
+
+    def disconnected(self) -> None:
+        self.logger.error("Lost connection to cluster supervisor.")
+        self.client.shard_manager.graceful_shutdown(None, None)
+
+    async def handle_message(self, message: Dict[str, Any]) -> None:
+        op = message.get("op")
+
+        if op == "response":
+            future = self.pending.get(message.get("nonce"))
+            if future is not None and not future.done():
+                future.set_result(message.get("d"))
+        elif op == "shutdown":
+            self.client.shard_manager.graceful_shutdown(None, None)
+        elif op == "broadcast":
+            self.client.events.dispatch("on_cluster_message", message.get("cluster_id"), message.get("d"))
+        elif op == "global_pause":
+            self.client.http.global_limiter.pause(message["d"]["retry_after"], relay=False)
+        elif op == "query":
+            # Unknown queries answer None so the asking cluster is never left waiting.
+            handler = self.handlers.get(message.get("query"))
+            try:
+                result = await handler(message.get("d")) if handler else None
+            except Exception as e:
+                self.logger.error(f"Error while handling cluster query '{message.get('query')}': {e}")
+                result = None
+            self.send({"op": "query_response", "nonce": message.get("nonce"), "d": result})
+
+    async def run(self, load_commands: bool) -> None:
+        self.loop = asyncio.get_running_loop()
+        threading.Thread(target=self.read, name=f"cluster-{self.cluster_id}-ipc", daemon=True).start()
+        await self.client.run_async(load_commands=load_commands)
+
+
+def run_cluster(
+    client,
+    cluster_id: int,
+    clusters: List[List[int]],
+    total_shards: int,
+    gateway_url: str,
+    conn,
+    inherited: Iterable[Any] = ()
+) -> None:
+    from .HTTPClient import GLOBAL_RATE_LIMIT, GlobalRateLimiter
+    from .ShardManager import ShardManager
+    from .WebSocket import WebSocketManager
+
+    # Forked copies of the supervisor's pipe ends would keep recv() from ever seeing EOF.
+    for inherited_conn in inherited:
+        inherited_conn.close()
+
+    shard_ids = clusters[cluster_id]
+    client.cluster = ClusterConnection(client, cluster_id, shard_ids, clusters, total_shards, conn)
+
+    # The global REST limit is per token, so every cluster gets an equal share and relays global 429s.
+    limiter = GlobalRateLimiter(rate=GLOBAL_RATE_LIMIT / len(clusters))
+    limiter.on_pause = client.cluster.relay_global_pause
+    GlobalRateLimiter.limiters[client.token] = client.http.global_limiter = limiter
+    client.total_shards = total_shards
+    client.gateway_url = gateway_url
+    client.websocket_manager = WebSocketManager(client, shard_ids[0], total_shards)
+    client.shard_manager = ShardManager(client, shard_ids, total_shards)
+    client.shard_manager.identify_limiter = client.cluster.identify_limiter
+
+    asyncio.run(client.cluster.run(load_commands=cluster_id == 0))
+
+    # Exit code 0 tells the supervisor not to restart this cluster.
+    fatal = {
+        shard_id: shard.fatal_close_code
+        for shard_id, shard in client.shard_manager.shards.items()
+        if shard.fatal_close_code is not None
+    }
+    if fatal:
+        try:
+            conn.send({"op": "fatal", "cluster_id": cluster_id, "d": {"close_codes": fatal}})
+        except (BrokenPipeError, OSError):
+            pass
+    elif client.running:
+        sys.exit(1)
+
+
+class ClusterSupervisor:
+    def __init__(
+        self,
+        client,
+        clusters: Optional[int] = None,
+        shards_per_cluster: Optional[int] = None,
+        restart_delay: float = 5.0
+    ) -> None:
+        self.client = client
+        self.clusters = clusters
+        self.shards_per_cluster = shards_per_cluster
+        self.restart_delay = restart_delay
+        self.total_shards = client.total_shards
+        self.max_concurrency = 1
+        self.gateway_url = client.gateway_url
+        self.ranges: List[List[int]] = []
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self.connections: Dict[int, Any] = {}
+        self.restart_at: Dict[int, float] = {}
+        self.identify_queue: List[Dict[str, Any]] = []
+        self.last_identify: Dict[int, float] = {}
+        self.queries: Dict[int, Dict[str, Any]] = {}
+        self.query_nonces = itertools.count()
+        self.fatal: Dict[int, Dict[int, int]] = {}
+        self.shutting_down = False
+        self.logger = logging.getLogger("ClusterSupervisor")
+
+        try:
+            self.context = multiprocessing.get_context("fork")
+        except ValueError:
+            raise RuntimeError("Cluster mode requires the 'fork' multiprocessing start method.")
+
+    async def fetch_gateway_bot(self) -> Optional[Dict[str, Any]]:
+        from .ShardManager import ShardManager
+
+        try:
+            return await ShardManager(self.client).fetch_gateway_bot()
+        finally:
+            # Workers are forked afterwards and must not share this session.
+            await self.client.http.close()
+
+    def configure(self) -> None:
+        info = asyncio.run(self.fetch_gateway_bot())
+        if info:
+            self.gateway_url = self.client.build_gateway_url(info["url"])
+            if self.total_shards is None:
+                self.total_shards = info.get("shards", 1)
+            self.max_concurrency = max(1, info.get("session_start_limit", {}).get("max_concurrency", 1))
+        if self.total_shards is None:
+            self.total_shards = 1
+
+        if self.shards_per_cluster:
+            clusters = -(-self.total_shards // self.shards_per_cluster)
+        else:
+            clusters = self.clusters or os.cpu_count() or 1
+        self.ranges = split_shards(self.total_shards, clusters)
+
+    def spawn(self, cluster_id: int) -> None:
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(
+            target=run_cluster,
+            args=(
+                self.client, cluster_id, self.ranges, self.total_shards, self.gateway_url, child_conn,
+                [parent_conn, *self.connections.values()]
+            ),
+            name=f"PaulCord-cluster-{cluster_id}",
+            daemon=False
+        )
+        process.start()
+        child_conn.close()
+        self.processes[cluster_id] = process
+        self.connections[cluster_id] = parent_conn
+        self.logger.info(f"Started cluster {cluster_id} (pid {process.pid}) with shards {self.ranges[cluster_id]}")
+
+    def cluster_for_guild(self, guild_id) -> int:
+        shard_id = (int(guild_id) >> 22) % self.total_shards
+        for cluster_id, shard_ids in enumerate(self.ranges):
+            if shard_id in shard_ids:
+                return cluster_id
+        return -1
+
+    def reply(self, cluster_id: int, nonce: Any, data: Any) -> None:
+        conn = self.connections.get(cluster_id)
+        if conn is None:
+            return
+        try:
+            conn.send({"op": "response", "nonce": nonce, "d": data})
+        except (BrokenPipeError, OSError) as e:
+            self.logger.error(f"Failed to reply to cluster {cluster_id}: {e}")
+
+    def handle_message(self, cluster_id: int, message: Dict[str, Any]) -> None:
+        op = message.get("op")
+        data = message.get("d") or {}
+
+        if op == "identify":
+            self.identify_queue.append({"cluster_id": cluster_id, "nonce": message["nonce"], "shard_id": data["shard_id"]})
+        elif op == "guild_cluster":
+            self.reply(cluster_id, message["nonce"], self.cluster_for_guild(data["guild_id"]))
+        elif op in ("status", "query"):
+            query = data.pop("query", None) if op == "query" else "status"
+            query_nonce = next(self.query_nonces)
+            self.queries[query_nonce] = {
+                "cluster_id": cluster_id,
+                "nonce": message["nonce"],
+                "waiting": set(self.connections),
+                "results": {}
+            }
+            for target_id, conn in list(self.connections.items()):
+                try:
+                    conn.send({"op": "query", "query": query, "nonce": query_nonce, "target": target_id, "d": data})
+                except (BrokenPipeError, OSError):
+                    self.finish_query(query_nonce, target_id, None)
+        elif op == "fatal":
+            self.fatal[cluster_id] = data["close_codes"]
+            self.logger.error(f"Cluster {cluster_id} stopped shards on fatal close codes {data['close_codes']}.")
+        elif op == "query_response":
+            self.finish_query(message["nonce"], cluster_id, message.get("d"))
+        elif op in ("broadcast", "global_pause"):
+            for target_id, conn in list(self.connections.items()):
+                if target_id != cluster_id:
+                    try:
+                        conn.send(message)
+                    except (BrokenPipeError, OSError):
+                        pass
+        elif "nonce" in message:
+            self.logger.warning(f"Cluster {cluster_id} sent unknown request '{op}'.")
+            self.reply(cluster_id, message["nonce"], None)
+
+    def finish_query(self, query_nonce: int, cluster_id: int, result: Any) -> None:
+        query = self.queries.get(query_nonce)
+        if query is None or cluster_id not in query["waiting"]:
+            return
+        query["results"][cluster_id] = result
+        query["waiting"].discard(cluster_id)
+        if not query["waiting"]:
+            del self.queries[query_nonce]
+            self.reply(query["cluster_id"], query["nonce"], query["results"])
+
+    def process_identify_queue(self) -> None:
+        now = time.monotonic()
+        self.identify_queue.sort(key=lambda request: request["shard_id"])
+        granted = set()
+        for request in list(self.identify_queue):
+            key = request["shard_id"] % self.max_concurrency
+            if key in granted or now < self.last_identify.get(key, 0) + IDENTIFY_INTERVAL:
+                continue
+            granted.add(key)
+            self.last_identify[key] = now
+            self.identify_queue.remove(request)
+            self.reply(request["cluster_id"], request["nonce"], True)
+
+    def handle_exit(self, cluster_id: int) -> None:
+        process = self.processes.pop(cluster_id)
+        conn = self.connections.pop(cluster_id, None)
+        if conn is not None:
+            # A worker's last messages (a fatal report) can still be queued behind its exit.
+            try:
+                while conn.poll():
+                    self.handle_message(cluster_id, conn.recv())
+            except (EOFError, OSError):
+                pass
+            conn.close()
+        self.identify_queue = [request for request in self.identify_queue if request["cluster_id"] != cluster_id]
+        for query_nonce in list(self.queries):
+            self.finish_query(query_nonce, cluster_id, None)
+
+        if self.shutting_down:
+            return
+        if process.exitcode == 0:
+            self.logger.error(f"Cluster {cluster_id} stopped cleanly, not restarting.")
+            return
+        self.logger.error(
+            f"Cluster {cluster_id} exited with code {process.exitcode}, restarting in {self.restart_delay}s."
+        )
+        self.restart_at[cluster_id] = time.monotonic() + self.restart_delay
+
+    def shutdown(self, signum=None, frame=None) -> None:
+        if self.shutting_down:
+            return
+        self.shutting_down = True
+        self.logger.info("Shutting down clusters.")
+        for conn in self.connections.values():
+            try:
+                conn.send({"op": "shutdown"})
+            except (BrokenPipeError, OSError):
+                pass
+
+    def run(self) -> None:
+        self.configure()
+        signal.signal(signal.SIGINT, self.shutdown)
+        signal.signal(signal.SIGTERM, self.shutdown)
+
+        for cluster_id in range(len(self.ranges)):
+            self.spawn(cluster_id)
+
+        while self.processes or (self.restart_at and not self.shutting_down):
+            now = time.monotonic()
+            for cluster_id, restart_at in list(self.restart_at.items()):
+                if now >= restart_at and not self.shutting_down:
+                    del self.restart_at[cluster_id]
+                    self.spawn(cluster_id)
+
+            sentinels = {process.sentinel: cluster_id for cluster_id, process in self.processes.items()}
+            connections = {conn: cluster_id for cluster_id, conn in self.connections.items()}
+            for ready in wait(list(sentinels) + list(connections), timeout=0.25):
+                if ready in connections:
+                    cluster_id = connections[ready]
+                    try:
+                        message = ready.recv()
+                    except (EOFError, OSError):
+                        continue
+                    self.handle_message(cluster_id, message)
+                elif ready in sentinels:
+                    self.processes[sentinels[ready]].join()
+                    self.handle_exit(sentinels[ready])
+
+            self.process_identify_queue()
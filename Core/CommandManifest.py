@@ -0,0 +1,89 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+
+def command_hash(application_id, payloads: List[Dict[str, Any]]) -> str:
+    canonical = json.dumps(
+        {"application_id": str(application_id), "commands": sorted(payloads, key=lambda command: command["name"])},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CommandManifest:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.logger = logging.getLogger("CommandManifest")
+
+    def read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable command manifest {self.path}: {e}")
+            return {}
+        return manifest if isinstance(manifest, dict) else {}
+
+    def load(self, scope: str = "global") -> Optional[Dict[str, Any]]:
+        entry = self.read().get(scope)
+        if not isinstance(entry, dict) or not entry.get("hash"):
+            return None
+        return entry
+
+    def matches(self, digest: str, scope: str = "global") -> bool:
+        entry = self.load(scope)
+        return entry is not None and entry["hash"] == digest
+
+    @staticmethod
+    def entry(digest: str, commands: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "hash": digest,
+            "commands": {command["name"]: command.get("id") for command in commands},
+            "synced_at": time.time(),
+        }
+
+    def save(self, digest: str, commands: List[Dict[str, Any]], scope: str = "global") -> None:
+        self.update({scope: self.entry(digest, commands)})
+
+    def update(self, entries: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        # A None entry removes that scope.
+        if not entries:
+            return
+        manifest = self.read()
+        for scope, entry in entries.items():
+            if entry is None:
+                manifest.pop(scope, None)
+            else:
+                manifest[scope] = entry
+        self.write(manifest)
+
+    def clear(self, scope: str = "global") -> None:
+        manifest = self.read()
+        if manifest.pop(scope, None) is not None:
+            self.write(manifest)
+
+    def write(self, manifest: Dict[str, Any]) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".commands.", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(manifest, file, indent=2, sort_keys=True)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
@@ -1,10 +1,11 @@
-import aiohttp
 import asyncio
-import random
-from typing import Any, Dict, List, Tuple
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from .CommandManifest import CommandManifest, command_hash
+
 class SlashCommand:
     def __init__(
         self,
@@ -20,23 +21,69 @@ class SlashCommand:
         self.integration_types = integration_types
         self.version = version
 
+OPTION_KEYS = (
+    "type", "name", "description", "required", "choices", "options", "channel_types",
+    "min_value", "max_value", "min_length", "max_length", "autocomplete"
+)
+COMMAND_DEFAULTS = {"type": 1, "integration_types": [0], "contexts": None, "nsfw": False}
+
+
+def normalize_option(option: Dict[str, Any]) -> Dict[str, Any]:
+    normalized = {}
+    for key in OPTION_KEYS:
+        value = option.get(key)
+        # The API omits false/empty values, while local definitions often spell them out.
+        if value is None or value is False or value == []:
+            continue
+        if key == "options":
+            value = [normalize_option(item) for item in value]
+        elif key == "choices":
+            value = [{"name": choice["name"], "value": choice["value"]} for choice in value]
+        elif key == "channel_types":
+            value = sorted(value)
+        normalized[key] = value
+    return normalized
+
+
+def normalize_command(command: Dict[str, Any]) -> Dict[str, Any]:
+    normalized = {
+        "name": command["name"],
+        "description": command.get("description") or "",
+        "options": [normalize_option(option) for option in command.get("options") or []],
+    }
+    for key, default in COMMAND_DEFAULTS.items():
+        value = command.get(key)
+        if isinstance(value, list):
+            value = sorted(value)
+        normalized[key] = default if value is None else value
+    permissions = command.get("default_member_permissions")
+    normalized["default_member_permissions"] = str(permissions) if permissions is not None else None
+    return normalized
+
+
+def command_sets_equal(existing: List[Dict[str, Any]], desired: List[Dict[str, Any]]) -> bool:
+    existing_map = {command["name"]: normalize_command(command) for command in existing}
+    desired_map = {command["name"]: normalize_command(command) for command in desired}
+    return existing_map == desired_map
+
+
 class CommandRegistration:
     def __init__(self, client) -> None:
         self.client = client
         self.console = Console()
-
-    async def rate_limit_sleep(self, seconds: float) -> None:
-        await asyncio.sleep(seconds)
+        manifest = getattr(client, "command_manifest", None)
+        self.manifest = CommandManifest(manifest) if isinstance(manifest, str) else manifest
 
     async def send_request(
         self,
         method: str,
         url: str,
         headers: Dict[str, str],
-        json: Any = None
+        json: Any = None,
+        quiet: bool = False
     ) -> Tuple[int, Any]:
-        max_attempts = 5
-        attempts = 0
+        if quiet:
+            return await self.perform_request(method, url, headers, json)
 
         with Progress(
             SpinnerColumn(),
@@ -45,81 +92,96 @@ class CommandRegistration:
             transient=True,
             refresh_per_second=5
         ) as progress:
-            task_id = progress.add_task(
-                f"[cyan]Sending request: {method} {url} (attempt {attempts+1}/{max_attempts})[/cyan]",
-                total=None
-            )
+            progress.add_task(f"[cyan]Request: {method} {url}[/cyan]", total=None)
+            return await self.perform_request(method, url, headers, json)
 
-            while attempts < max_attempts:
-                progress.update(
-                    task_id,
-                    description=(
-                        f"[cyan]Request: {method} {url} "
-                        f"(attempt {attempts+1}/{max_attempts})[/cyan]"
-                    )
-                )
+    async def perform_request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        json: Any = None
+    ) -> Tuple[int, Any]:
+        async with self.client.http.request(
+            method, url, headers=headers, json=json
+        ) as response:
+            status_code = response.status
 
-                async with self.client.session.request(
-                    method, url, headers=headers, json=json
-                ) as response:
-                    status_code = response.status
-                    response_text = await response.text()
-
-                    progress.update(
-                        task_id,
-                        description=(
-                            f"[yellow]Status Code: {status_code}. "
-                            f"Processing response...[/yellow]"
-                        )
-                    )
+            if response.content_type == 'application/json':
+                json_data = await response.json(loads=self.client.codec.loads)
+                return status_code, json_data
+            else:
+                return status_code, await response.text()
 
-                    if status_code == 429:
-                        data = await response.json()
-                        retry_after = data.get('retry_after', 1)
-                        progress.update(
-                            task_id,
-                            description=(
-                                f"[bold red]Rate limited! Sleeping for {retry_after}s. "
-                                f"Attempt {attempts+1}/{max_attempts}[/bold red]"
-                            )
-                        )
-                        await self.rate_limit_sleep(retry_after)
-                        attempts += 1
-                        continue
-
-                    if response.content_type == 'application/json':
-                        json_data = await response.json()
-                        return status_code, json_data
-                    else:
-                        return status_code, response_text
-
-            raise Exception(f"Max attempts reached for {method} {url}")
-
-    async def get_existing_commands(self) -> List[Dict[str, Any]]:
-        url = f"{self.client.base_url}/applications/{self.client.application_id}/commands"
+    def global_commands(self) -> List[Dict[str, Any]]:
+        return [command for command in self.client.commands if not command.get("guild_ids")]
+
+    def guild_commands(self) -> Dict[str, List[Dict[str, Any]]]:
+        commands: Dict[str, List[Dict[str, Any]]] = {}
+        for command in self.client.commands:
+            for guild_id in command.get("guild_ids") or ():
+                commands.setdefault(str(guild_id), []).append(command)
+        return commands
+
+    def commands_url(self, guild_id: Optional[str] = None) -> str:
+        if guild_id is None:
+            return f"{self.client.base_url}/applications/{self.client.application_id}/commands"
+        return f"{self.client.base_url}/applications/{self.client.application_id}/guilds/{guild_id}/commands"
+
+    async def get_existing_commands(self, guild_id: Optional[str] = None, quiet: bool = False) -> List[Dict[str, Any]]:
+        url = self.commands_url(guild_id)
         headers = {
             "Authorization": f"Bot {self.client.token}"
         }
 
-        status_code, response_data = await self.send_request("GET", url, headers)
+        status_code, response_data = await self.send_request("GET", url, headers, quiet=quiet)
         if status_code == 200:
             return response_data
         else:
-            self.console.print("[red]Failed to retrieve existing commands.[/red]")
+            self.console.print(
+                f"[red]Failed to retrieve existing commands{f' for guild {guild_id}' if guild_id else ''}.[/red]"
+            )
             return []
 
+    def build_payload(self, command: Dict[str, Any], guild_scoped: bool = False) -> Dict[str, Any]:
+        payload = {
+            "name": command["name"],
+            "description": command["description"],
+            "options": self.build_options(command.get("options", [])),
+        }
+        # Install and interaction contexts only apply to global commands.
+        if not guild_scoped:
+            payload["contexts"] = [0, 1, 2]
+            payload["integration_types"] = [0, 1] if command.get("integration_types", False) else [0]
+        return payload
+
     def commands_are_equal(
         self,
         existing_command: Dict[str, Any],
         new_command: Dict[str, Any]
     ) -> bool:
-        return (
-            existing_command['name'] == new_command['name'] and
-            existing_command['description'] == new_command['description'] and
-            existing_command.get('options', []) == new_command.get('options', []) and
-            existing_command.get('integration_types', []) == new_command.get('integration_types', []) and
-            existing_command.get('version', 1) == new_command.get('version', 1)
-        )
+        return normalize_command(existing_command) == normalize_command(self.build_payload(new_command))
+
+    async def bulk_overwrite(
+        self,
+        payloads: List[Dict[str, Any]],
+        guild_id: Optional[str] = None,
+        quiet: bool = False
+    ) -> Optional[List[Dict[str, Any]]]:
+        url = self.commands_url(guild_id)
+        headers = {
+            "Authorization": f"Bot {self.client.token}",
+            "Content-Type": "application/json"
+        }
+
+        status_code, response_data = await self.send_request("PUT", url, headers, json=payloads, quiet=quiet)
+        if status_code != 200:
+            self.console.print(
+                f"[red]Failed to overwrite commands{f' for guild {guild_id}' if guild_id else ''}: "
+                f"{status_code} {response_data}[/red]"
+            )
+            return None
+        return response_data
 
     async def register_commands(self) -> None:
         url = f"{self.client.base_url}/applications/{self.client.application_id}/commands"
@@ -130,16 +192,8 @@ class CommandRegistration:
 
         existing_commands = await self.get_existing_commands()
 
-        for command in self.client.commands:
-            payload = {
-                "name": command["name"],
-                "description": command["description"],
-                "options": self.build_options(command.get("options", [])),
-                "contexts": [0, 1, 2],
-                "integration_types": (
-                    [0, 1] if command.get("integration_types", False) else [0]
-                )
-            }
+        for command in self.global_commands():
+            payload = self.build_payload(command)
 
             existing_command = next(
                 (cmd for cmd in existing_commands if cmd['name'] == command["name"]),
@@ -195,20 +249,16 @@ class CommandRegistration:
                 f"[red]Failed to delete command {command_id}: {status_code} {response_data}[/red]"
             )
 
-    async def sync_commands(self) -> None:
+    async def sync_commands(self, bulk: bool = True, force: bool = False) -> None:
+        if bulk:
+            await self.bulk_sync_commands(force)
+            return
+
         existing_commands = await self.get_existing_commands()
         existing_commands_dict = {cmd['name']: cmd for cmd in existing_commands}
 
-        for command in self.client.commands:
-            command_payload = {
-                "name": command["name"],
-                "description": command["description"],
-                "options": self.build_options(command.get("options", [])),
-                "integration_types": (
-                    [0, 1] if command.get("integration_types", False) else [0]
-                ),
-                "contexts": [0, 1, 2]
-            }
+        for command in self.global_commands():
+            command_payload = self.build_payload(command)
 
             if command["name"] in existing_commands_dict:
                 existing_command = existing_commands_dict[command["name"]]
@@ -253,12 +303,120 @@ class CommandRegistration:
                     )
 
         for existing_command in existing_commands:
-            if existing_command["name"] not in {cmd["name"] for cmd in self.client.commands}:
+            if existing_command["name"] not in {cmd["name"] for cmd in self.global_commands()}:
                 self.console.print(
                     f"[magenta]Deleting command: {existing_command['name']}[/magenta]"
                 )
                 await self.delete_command(existing_command['id'])
 
+    async def bulk_sync_commands(self, force: bool = False) -> Optional[List[Dict[str, Any]]]:
+        payloads = [self.build_payload(command) for command in self.global_commands()]
+        digest = command_hash(self.client.application_id, [normalize_command(payload) for payload in payloads])
+
+        # Commands edited outside this process are not detected here; pass force=True to recheck.
+        if not force and self.manifest is not None and self.manifest.matches(digest):
+            self.console.print("[green]Command manifest is up to date. Skipping sync.[/green]")
+            return None
+
+        existing_commands = await self.get_existing_commands()
+        if command_sets_equal(existing_commands, payloads):
+            self.console.print("[green]Commands are already up to date. Skipping sync.[/green]")
+            commands = existing_commands
+        else:
+            self.console.print(f"[cyan]Overwriting {len(payloads)} command(s) in a single request.[/cyan]")
+            commands = await self.bulk_overwrite(payloads)
+
+        if commands is not None and self.manifest is not None:
+            try:
+                self.manifest.save(digest, commands)
+            except OSError as e:
+                self.console.print(f"[yellow]Failed to write command manifest: {e}[/yellow]")
+        return commands
+
+    async def sync_guild_commands(
+        self,
+        commands: Optional[Dict[Any, List[Dict[str, Any]]]] = None,
+        concurrency: int = 8,
+        force: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        # The manifest is read once and written once, so guilds never wait on each other's disk I/O.
+        known = self.manifest.read() if self.manifest is not None else {}
+        if commands is None:
+            commands = self.guild_commands()
+            # Guilds synced before but no longer targeted by any command get their commands cleared.
+            for scope in known:
+                if scope.startswith("guild:"):
+                    commands.setdefault(scope[len("guild:"):], [])
+        commands = {str(guild_id): guild_commands for guild_id, guild_commands in commands.items()}
+        if not commands:
+            return {}
+        semaphore = asyncio.Semaphore(concurrency)
+        entries: Dict[str, Optional[Dict[str, Any]]] = {}
+
+        async def sync(guild_id: str, guild_commands: List[Dict[str, Any]]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await self.sync_guild(guild_id, guild_commands, force, known, entries)
+                except Exception as e:
+                    return {"status": "failed", "commands": len(guild_commands), "error": str(e)}
+
+        results = await asyncio.gather(*(sync(guild_id, guild_commands) for guild_id, guild_commands in commands.items()))
+        summary = dict(zip(commands, results))
+
+        if entries and self.manifest is not None:
+            try:
+                self.manifest.update(entries)
+            except OSError as e:
+                self.console.print(f"[yellow]Failed to write command manifest: {e}[/yellow]")
+
+        counts = Counter(result["status"] for result in results)
+        self.console.print(
+            f"[cyan]Guild command sync finished for {len(summary)} guild(s): "
+            f"{', '.join(f'{count} {status}' for status, count in sorted(counts.items())) or 'nothing to do'}[/cyan]"
+        )
+        return summary
+
+    async def sync_guild(
+        self,
+        guild_id: str,
+        commands: List[Dict[str, Any]],
+        force: bool = False,
+        known: Optional[Dict[str, Any]] = None,
+        entries: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+    ) -> Dict[str, Any]:
+        scope = f"guild:{guild_id}"
+        if not commands:
+            # A failed GET also reads as [], so clear with the overwrite itself rather than comparing first.
+            if await self.bulk_overwrite([], guild_id, quiet=True) is None:
+                return {"status": "failed", "commands": 0, "error": "bulk overwrite rejected"}
+            if entries is not None:
+                entries[scope] = None
+            return {"status": "cleared", "commands": 0}
+
+        payloads = [self.build_payload(command, guild_scoped=True) for command in commands]
+        digest = command_hash(
+            f"{self.client.application_id}/{guild_id}",
+            [normalize_command(payload) for payload in payloads]
+        )
+
+        entry = (known or {}).get(scope)
+        if not force and isinstance(entry, dict) and entry.get("hash") == digest:
+            return {"status": "cached", "commands": len(payloads)}
+
+        existing_commands = await self.get_existing_commands(guild_id, quiet=True)
+        if command_sets_equal(existing_commands, payloads):
+            status = "unchanged"
+            result = existing_commands
+        else:
+            status = "updated"
+            result = await self.bulk_overwrite(payloads, guild_id, quiet=True)
+            if result is None:
+                return {"status": "failed", "commands": len(payloads), "error": "bulk overwrite rejected"}
+
+        if entries is not None:
+            entries[scope] = CommandManifest.entry(digest, result)
+        return {"status": status, "commands": len(payloads)}
+
     def build_options(self, options: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         discord_options = []
         for option in options:
@@ -268,5 +426,8 @@ class CommandRegistration:
                 "description": option["description"],
                 "required": option.get("required", False)
             }
+            for key in OPTION_KEYS[4:]:
+                if key in option:
+                    discord_option[key] = self.build_options(option[key]) if key == "options" else option[key]
             discord_options.append(discord_option)
         return discord_options
@@ -6,7 +6,7 @@ class CommandDecorator:
         self.client = client
         self.commands = []
 
-    def slash_commands(self, name=None, description=None, options=None, integration_types=False):
+    def slash_commands(self, name=None, description=None, options=None, integration_types=False, guild_ids=None):
         def wrapper(func):
             if not description:
                 raise ValueError(f"Description is required for command '{name}'")
@@ -16,7 +16,8 @@ class CommandDecorator:
                 "description": description or func.__doc__,
                 "func": func,
                 "options": options or [],
-                "integration_types": integration_types
+                "integration_types": integration_types,
+                "guild_ids": [str(guild_id) for guild_id in guild_ids] if guild_ids else None
             }
 
             self.client.commands.append(cmd)
@@ -45,7 +46,9 @@ class CommandDecorator:
     def permissions(self, **permissions):
         def wrapper(func):
             async def wrapped_func(client, interaction, *args, **kwargs):
-                print(f"Interaction data for debugging: {interaction}")
+                trace = client.tracer.commands
+                if trace:
+                    trace.debug("Checking member permissions", interaction=lambda: interaction)
 
                 if 'member' not in interaction or 'permissions' not in interaction['member']:
                     await client.api_helper.send_interaction_response(
@@ -57,13 +60,16 @@ class CommandDecorator:
                     return
 
                 member_permissions = int(interaction['member']['permissions'])
-                print(f"Converted permissions value: {member_permissions}")
 
                 missing_permissions = []
 
                 for permission, required in permissions.items():
                     required_bit = 1 << required
-                    print(f"Checking permission '{permission}' ({required_bit}) against member permissions: {member_permissions}")
+                    if trace:
+                        trace.debug(
+                            "Checking permission %s (%s) against member permissions: %s",
+                            permission, required_bit, member_permissions
+                        )
                     if not (member_permissions & required_bit):
                         missing_permissions.append(permission)
 
@@ -85,7 +91,9 @@ class CommandDecorator:
     def permissionsbot(self, **permissions):
         def wrapper(func):
             async def wrapped_func(client, interaction, *args, **kwargs):
-                print(f"Checking bot permissions for interaction: {interaction}")
+                trace = client.tracer.commands
+                if trace:
+                    trace.debug("Checking bot permissions", interaction=lambda: interaction)
 
                 if 'app_permissions' not in interaction:
                     await client.api_helper.send_interaction_response(
@@ -97,13 +105,16 @@ class CommandDecorator:
                     return
 
                 bot_permissions = int(interaction['app_permissions'])
-                print(f"Bot's permissions value: {bot_permissions}")
 
                 missing_permissions = []
 
                 for permission, required in permissions.items():
                     required_bit = 1 << required
-                    print(f"Checking bot permission '{permission}' ({required_bit}) against bot permissions: {bot_permissions}")
+                    if trace:
+                        trace.debug(
+                            "Checking bot permission %s (%s) against bot permissions: %s",
+                            permission, required_bit, bot_permissions
+                        )
                     if not (bot_permissions & required_bit):
                         missing_permissions.append(permission)
 
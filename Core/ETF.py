@@ -0,0 +1,213 @@
+import struct
+import zlib
+from typing import Any
+
+
+VERSION = 131
+
+NEW_FLOAT_EXT = 70
+COMPRESSED = 80
+SMALL_INTEGER_EXT = 97
+INTEGER_EXT = 98
+FLOAT_EXT = 99
+ATOM_EXT = 100
+SMALL_TUPLE_EXT = 104
+LARGE_TUPLE_EXT = 105
+NIL_EXT = 106
+STRING_EXT = 107
+LIST_EXT = 108
+BINARY_EXT = 109
+SMALL_BIG_EXT = 110
+LARGE_BIG_EXT = 111
+SMALL_ATOM_EXT = 115
+MAP_EXT = 116
+ATOM_UTF8_EXT = 118
+SMALL_ATOM_UTF8_EXT = 119
+
+ATOMS = {"nil": None, "null": None, "true": True, "false": False}
+
+_unpack_int = struct.Struct(">i").unpack_from
+_unpack_uint = struct.Struct(">I").unpack_from
+_unpack_ushort = struct.Struct(">H").unpack_from
+_unpack_double = struct.Struct(">d").unpack_from
+_pack_int = struct.Struct(">Bi").pack
+_pack_uint = struct.Struct(">BI").pack
+_pack_double = struct.Struct(">Bd").pack
+
+
+class ETFError(Exception):
+    pass
+
+
+def decode(data: bytes) -> Any:
+    data = bytes(data)
+    if not data or data[0] != VERSION:
+        raise ETFError("Invalid ETF version byte")
+
+    position = 1
+
+    def atom(value: str) -> Any:
+        return ATOMS.get(value, value)
+
+    def read() -> Any:
+        nonlocal position
+        tag = data[position]
+        position += 1
+
+        if tag == MAP_EXT:
+            arity = _unpack_uint(data, position)[0]
+            position += 4
+            result = {}
+            for _ in range(arity):
+                key = read()
+                result[key] = read()
+            return result
+
+        if tag == BINARY_EXT:
+            length = _unpack_uint(data, position)[0]
+            position += 4
+            value = data[position:position + length].decode("utf-8", "replace")
+            position += length
+            return value
+
+        if tag == SMALL_INTEGER_EXT:
+            position += 1
+            return data[position - 1]
+
+        if tag == INTEGER_EXT:
+            position += 4
+            return _unpack_int(data, position - 4)[0]
+
+        if tag == SMALL_ATOM_UTF8_EXT or tag == SMALL_ATOM_EXT:
+            length = data[position]
+            position += 1
+            value = data[position:position + length].decode("utf-8")
+            position += length
+            return atom(value)
+
+        if tag == ATOM_UTF8_EXT or tag == ATOM_EXT:
+            length = _unpack_ushort(data, position)[0]
+            position += 2
+            value = data[position:position + length].decode("utf-8")
+            position += length
+            return atom(value)
+
+        if tag == LIST_EXT:
+            length = _unpack_uint(data, position)[0]
+            position += 4
+            result = [read() for _ in range(length)]
+            if data[position] == NIL_EXT:
+                position += 1
+            else:
+                read()
+            return result
+
+        if tag == NIL_EXT:
+            return []
+
+        if tag == SMALL_BIG_EXT or tag == LARGE_BIG_EXT:
+            if tag == SMALL_BIG_EXT:
+                length = data[position]
+                position += 1
+            else:
+                length = _unpack_uint(data, position)[0]
+                position += 4
+            sign = data[position]
+            value = int.from_bytes(data[position + 1:position + 1 + length], "little")
+            position += 1 + length
+            return -value if sign else value
+
+        if tag == NEW_FLOAT_EXT:
+            position += 8
+            return _unpack_double(data, position - 8)[0]
+
+        if tag == STRING_EXT:
+            length = _unpack_ushort(data, position)[0]
+            position += 2
+            value = data[position:position + length].decode("latin-1")
+            position += length
+            return value
+
+        if tag == SMALL_TUPLE_EXT or tag == LARGE_TUPLE_EXT:
+            if tag == SMALL_TUPLE_EXT:
+                arity = data[position]
+                position += 1
+            else:
+                arity = _unpack_uint(data, position)[0]
+                position += 4
+            return tuple(read() for _ in range(arity))
+
+        if tag == FLOAT_EXT:
+            value = float(data[position:position + 31].split(b"\x00", 1)[0])
+            position += 31
+            return value
+
+        raise ETFError(f"Unsupported ETF tag: {tag}")
+
+    if data[1] == COMPRESSED:
+        data = bytes([VERSION]) + zlib.decompress(data[6:])
+
+    return read()
+
+
+def encode(obj: Any) -> bytes:
+    buffer = bytearray([VERSION])
+    append = buffer.append
+    extend = buffer.extend
+
+    def write_atom(value: str) -> None:
+        raw = value.encode("utf-8")
+        append(SMALL_ATOM_UTF8_EXT)
+        append(len(raw))
+        extend(raw)
+
+    def write_binary(raw: bytes) -> None:
+        extend(_pack_uint(BINARY_EXT, len(raw)))
+        extend(raw)
+
+    def write(value: Any) -> None:
+        if value is None:
+            write_atom("nil")
+        elif value is True:
+            write_atom("true")
+        elif value is False:
+            write_atom("false")
+        elif isinstance(value, int):
+            if 0 <= value <= 255:
+                append(SMALL_INTEGER_EXT)
+                append(value)
+            elif -2147483648 <= value <= 2147483647:
+                extend(_pack_int(INTEGER_EXT, value))
+            else:
+                magnitude = abs(value)
+                raw = magnitude.to_bytes((magnitude.bit_length() + 7) // 8, "little")
+                if len(raw) > 255:
+                    raise ETFError("Integer too large to encode")
+                append(SMALL_BIG_EXT)
+                append(len(raw))
+                append(1 if value < 0 else 0)
+                extend(raw)
+        elif isinstance(value, float):
+            extend(_pack_double(NEW_FLOAT_EXT, value))
+        elif isinstance(value, str):
+            write_binary(value.encode("utf-8"))
+        elif isinstance(value, dict):
+            extend(_pack_uint(MAP_EXT, len(value)))
+            for key, item in value.items():
+                write(key)
+                write(item)
+        elif isinstance(value, (list, tuple)):
+            if not value:
+                append(NIL_EXT)
+                return
+            extend(_pack_uint(LIST_EXT, len(value)))
+            for item in value:
+                write(item)
+            append(NIL_EXT)
+        elif isinstance(value, (bytes, bytearray)):
+            write_binary(bytes(value))
+        else:
+            raise ETFError(f"Cannot encode object of type {type(value).__name__}")
+
+    write(obj)
+    return bytes(buffer)
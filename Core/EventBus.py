@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Optional, Set
+
+
+def normalize_event(name: str) -> str:
+    return name if name.startswith("on_") else f"on_{name}"
+
+
+class EventBus:
+    def __init__(self, client) -> None:
+        self.client = client
+        self.listeners: Dict[str, Dict[Callable, bool]] = {}
+        self.waiters: Dict[str, Dict[asyncio.Future, Optional[Callable[..., bool]]]] = {}
+        self.tasks: Set[asyncio.Task] = set()
+        self.logger = logging.getLogger("EventBus")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.listeners or name in self.waiters
+
+    def get(self, name: str, default: Any = None) -> Any:
+        listeners = self.listeners.get(normalize_event(name))
+        return next(iter(listeners)) if listeners else default
+
+    def add_listener(self, func: Callable, name: Optional[str] = None, once: bool = False) -> Callable:
+        name = normalize_event(name or func.__name__)
+        self.listeners.setdefault(name, {})[func] = once
+        return func
+
+    def remove_listener(self, func: Callable, name: Optional[str] = None) -> None:
+        name = normalize_event(name or func.__name__)
+        listeners = self.listeners.get(name)
+        if listeners is None:
+            return
+        listeners.pop(func, None)
+        if not listeners:
+            del self.listeners[name]
+
+    async def wait_for(
+        self,
+        event: str,
+        check: Optional[Callable[..., bool]] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        name = normalize_event(event)
+        future = asyncio.get_running_loop().create_future()
+        waiters = self.waiters.setdefault(name, {})
+        waiters[future] = check
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            waiters.pop(future, None)
+            if not waiters and self.waiters.get(name) is waiters:
+                del self.waiters[name]
+
+    def dispatch(self, name: str, *args: Any, **kwargs: Any) -> None:
+        name = normalize_event(name)
+        trace = self.client.tracer.dispatch
+
+        waiters = self.waiters.get(name)
+        if waiters:
+            result = args[0] if len(args) == 1 else args
+            for future, check in list(waiters.items()):
+                if future.done():
+                    continue
+                try:
+                    if check is None or check(*args):
+                        future.set_result(result)
+                except Exception as e:
+                    future.set_exception(e)
+
+        listeners = self.listeners.get(name)
+        if not listeners:
+            if trace:
+                trace.debug("No handler found for event %s", name)
+            return
+
+        if trace:
+            trace.debug("Dispatching event %s", name, listeners=len(listeners), args=lambda: args)
+
+        for func, once in list(listeners.items()):
+            if once:
+                self.remove_listener(func, name)
+            task = asyncio.create_task(self.run_listener(name, func, args, kwargs))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def run_listener(self, name: str, func: Callable, args: tuple, kwargs: dict) -> None:
+        try:
+            await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error in listener '{getattr(func, '__name__', func)}' for event '{name}': {e}")
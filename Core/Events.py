@@ -0,0 +1,55 @@
+from typing import Any, Callable, Dict
+
+from ..Resources.Message import Message
+
+
+_MISSING = object()
+
+
+class LazyModel:
+    __slots__ = ("_factory", "_client", "_payload", "_model")
+
+    def __init__(self, factory: Callable[[Any, dict], Any], client, payload: dict) -> None:
+        self._factory = factory
+        self._client = client
+        self._payload = payload
+        self._model = _MISSING
+
+    @property
+    def raw(self) -> dict:
+        return self._payload
+
+    def resolve(self) -> Any:
+        if self._model is _MISSING:
+            self._model = self._factory(self._client, self._payload)
+        return self._model
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._payload[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._payload.get(key, default)
+
+    def __repr__(self) -> str:
+        state = "resolved" if self._model is not _MISSING else "unresolved"
+        return f"<LazyModel {getattr(self._factory, '__qualname__', self._factory)} {state}>"
+
+
+EVENT_MODELS: Dict[str, Callable[[Any, dict], Any]] = {
+    "MESSAGE_CREATE": Message.from_payload,
+    "MESSAGE_UPDATE": Message.from_payload,
+}
+
+
+def event_name(event_type: str) -> str:
+    return f"on_{event_type.lower()}"
+
+
+def build_event_payload(client, event_type: str, payload: Any) -> Any:
+    factory = EVENT_MODELS.get(event_type)
+    if factory is None or not isinstance(payload, dict):
+        return payload
+    return LazyModel(factory, client, payload)
@@ -0,0 +1,390 @@
+import asyncio
+import aiohttp
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+GLOBAL_RATE_LIMIT = 50
+
+MAJOR_PARAMETERS = {
+    "channels": "{channel_id}",
+    "guilds": "{guild_id}",
+    "webhooks": "{webhook_id}",
+    "interactions": "{interaction_id}",
+}
+
+
+def parse_route(method: str, url: str) -> Tuple[str, str]:
+    parts = urlsplit(url).path.split("/")
+    try:
+        parts = parts[parts.index("v10") + 1:]
+    except ValueError:
+        parts = [part for part in parts if part]
+
+    major = ""
+    template = []
+    index = 0
+    while index < len(parts):
+        part = parts[index]
+        previous = parts[index - 1] if index else ""
+
+        # Majors are normally the first segment, but nested ones count too (/applications/{id}/guilds/{guild_id}/...).
+        if previous in MAJOR_PARAMETERS and (index == 1 or (not major and part.isdigit())):
+            major = part
+            if previous in ("webhooks", "interactions") and index + 1 < len(parts):
+                major = f"{part}/{parts[index + 1]}"
+                template.extend([MAJOR_PARAMETERS[previous], "{token}"])
+                index += 2
+                continue
+            template.append(MAJOR_PARAMETERS[previous])
+        elif previous == "reactions":
+            template.append("{emoji}")
+        elif part.isdigit():
+            template.append("{id}")
+        else:
+            template.append(part)
+        index += 1
+
+    return f"{method.upper()} /{'/'.join(template)}", major
+
+
+class RateLimitBucket:
+    def __init__(self) -> None:
+        self.limit: Optional[int] = None
+        # Until the first response reports the real limit, requests on the route go out one at a time.
+        self.remaining: Optional[int] = 1
+        self.reset_at: Optional[float] = None
+        self.lock = asyncio.Lock()
+        self.wakeup = asyncio.Event()
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        async with self.lock:
+            while True:
+                now = loop.time()
+                if self.reset_at is not None and now >= self.reset_at:
+                    self.remaining = self.limit
+                    self.reset_at = None
+
+                if self.remaining is None or self.remaining > 0:
+                    if self.remaining is not None:
+                        self.remaining -= 1
+                    return
+
+                if self.reset_at is None:
+                    self.wakeup.clear()
+                    await self.wakeup.wait()
+                else:
+                    await asyncio.sleep(self.reset_at - now)
+
+    def release(self) -> None:
+        # The request never got a response, so give back the probe slot of an unknown bucket.
+        if self.limit is None and self.reset_at is None and self.remaining == 0:
+            self.remaining = 1
+            self.wakeup.set()
+
+    def update(self, headers) -> None:
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if remaining is None or reset_after is None:
+            if self.limit is None:
+                self.remaining = None
+                self.wakeup.set()
+            return
+
+        now = asyncio.get_running_loop().time()
+        reset_at = now + float(reset_after)
+        limit = headers.get("X-RateLimit-Limit")
+        if limit is not None:
+            self.limit = int(limit)
+
+        if self.reset_at is None or reset_at > self.reset_at + 0.5 or self.remaining is None:
+            self.remaining = int(remaining)
+        else:
+            self.remaining = min(self.remaining, int(remaining))
+        self.reset_at = reset_at
+        self.wakeup.set()
+
+    def exhaust(self, retry_after: float) -> None:
+        self.remaining = 0
+        self.reset_at = asyncio.get_running_loop().time() + retry_after
+
+
+class RateLimitStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float) -> None:
+        self.count += 1
+        if wait >= 0.001:
+            self.waited += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "waited": self.waited,
+            "total_wait": self.total_wait,
+            "average_wait": self.average_wait,
+            "max_wait": self.max_wait,
+        }
+
+
+class GlobalRateLimiter:
+    limiters: Dict[str, "GlobalRateLimiter"] = {}
+
+    def __init__(self, rate: float = GLOBAL_RATE_LIMIT, per: float = 1.0) -> None:
+        self.rate = rate
+        self.per = per
+        # A fractional share of the limit (one of many clusters) still needs room for a whole request.
+        self.capacity = max(1.0, float(rate))
+        self.tokens = self.capacity
+        self.updated_at: Optional[float] = None
+        self.paused_until = 0.0
+        self.on_pause: Optional[Callable[[float], None]] = None
+        self.lock = asyncio.Lock()
+        self.stats = RateLimitStats()
+
+    @classmethod
+    def for_token(cls, token: str) -> "GlobalRateLimiter":
+        limiter = cls.limiters.get(token)
+        if limiter is None:
+            limiter = cls.limiters[token] = cls()
+        return limiter
+
+    async def acquire(self) -> float:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        async with self.lock:
+            while True:
+                now = loop.time()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+
+                if self.updated_at is not None:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate / self.per)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+
+                await asyncio.sleep((1 - self.tokens) * self.per / self.rate)
+
+        waited = loop.time() - started
+        self.stats.record(waited)
+        return waited
+
+    def pause(self, retry_after: float, relay: bool = True) -> None:
+        self.paused_until = max(self.paused_until, asyncio.get_running_loop().time() + retry_after)
+        self.tokens = 0
+        if relay and self.on_pause is not None:
+            self.on_pause(retry_after)
+
+
+class RequestContext:
+    def __init__(self, http: "HTTPClient", method: str, url: str, kwargs: Dict[str, Any]) -> None:
+        self.http = http
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+        self.response = None
+
+    async def __aenter__(self):
+        self.response = await self.http.perform(self.method, self.url, **self.kwargs)
+        return self.response
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self.response is not None:
+            self.response.release()
+
+
+class HTTPClient:
+    def __init__(
+        self,
+        client,
+        max_retries: int = 5,
+        connection_limit: int = 100,
+        connection_limit_per_host: int = 50,
+        keepalive_timeout: float = 60,
+        dns_cache_ttl: int = 300,
+        warm_connections: int = 2
+    ) -> None:
+        self.client = client
+        self.max_retries = max_retries
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.warm_connections = warm_connections
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.connector: Optional[aiohttp.TCPConnector] = None
+        self.route_buckets: Dict[str, str] = {}
+        self.buckets: Dict[str, RateLimitBucket] = {}
+        self.global_limiter = GlobalRateLimiter.for_token(client.token)
+        self.route_stats: Dict[str, RateLimitStats] = {}
+        self.logger = logging.getLogger("HTTPClient")
+
+    async def start(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                limit_per_host=self.connection_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True
+            )
+            self.session = aiohttp.ClientSession(connector=self.connector)
+        return self.session
+
+    async def warm_up(self) -> None:
+        session = await self.start()
+        url = f"{self.client.base_url}/gateway"
+
+        async def open_connection() -> None:
+            try:
+                async with session.get(url) as response:
+                    await response.read()
+            except aiohttp.ClientError as e:
+                self.logger.warning(f"Connection warm-up failed: {e}")
+
+        await asyncio.gather(*(open_connection() for _ in range(self.warm_connections)))
+
+    async def close(self) -> None:
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+        self.connector = None
+
+    def pool_stats(self) -> Dict[str, int]:
+        if self.connector is None:
+            return {"in_use": 0, "idle": 0, "limit": self.connection_limit}
+        in_use = len(getattr(self.connector, "_acquired", ()))
+        idle = sum(len(conns) for conns in getattr(self.connector, "_conns", {}).values())
+        return {"in_use": in_use, "idle": idle, "limit": self.connection_limit}
+
+    def get_bucket(self, route: str, major: str) -> RateLimitBucket:
+        key = f"{self.route_buckets.get(route, route)}:{major}"
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = RateLimitBucket()
+        return bucket
+
+    def learn_bucket(self, route: str, major: str, bucket: RateLimitBucket, bucket_hash: Optional[str]) -> None:
+        if not bucket_hash or self.route_buckets.get(route) == bucket_hash:
+            return
+        self.route_buckets[route] = bucket_hash
+        self.buckets.setdefault(f"{bucket_hash}:{major}", bucket)
+
+    def record_wait(self, route: str, wait: float) -> None:
+        stats = self.route_stats.get(route)
+        if stats is None:
+            stats = self.route_stats[route] = RateLimitStats()
+        stats.record(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "global": self.global_limiter.stats.to_dict(),
+            "routes": {route: stats.to_dict() for route, stats in self.route_stats.items()},
+            "pool": self.pool_stats(),
+        }
+
+    def request(self, method: str, url: str, **kwargs) -> RequestContext:
+        return RequestContext(self, method, url, kwargs)
+
+    def get(self, url: str, **kwargs) -> RequestContext:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> RequestContext:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> RequestContext:
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> RequestContext:
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> RequestContext:
+        return self.request("DELETE", url, **kwargs)
+
+    async def perform(self, method: str, url: str, **kwargs):
+        session = await self.start()
+        route, major = parse_route(method, url)
+        if "json" in kwargs:
+            body = kwargs.pop("json")
+            if body is not None:
+                kwargs["data"] = self.client.codec.dumps(body)
+                kwargs["headers"] = {**(kwargs.get("headers") or {}), "Content-Type": "application/json"}
+        # Interaction callbacks are not counted against the global limit.
+        is_global = not route.split(" ", 1)[1].startswith("/interactions/")
+        loop = asyncio.get_running_loop()
+
+        trace = self.client.tracer.http
+
+        for attempt in range(self.max_retries):
+            started = loop.time()
+            bucket = self.get_bucket(route, major)
+            await bucket.acquire()
+            try:
+                if is_global:
+                    await self.global_limiter.acquire()
+                waited = loop.time() - started
+                self.record_wait(route, waited)
+                if trace and waited >= 0.001:
+                    trace.debug("Waited %.3fs for rate limit", waited, route=route, major=major or "-")
+                response = await session.request(method, url, **kwargs)
+            except BaseException:
+                bucket.release()
+                raise
+            bucket.update(response.headers)
+            self.learn_bucket(route, major, bucket, response.headers.get("X-RateLimit-Bucket"))
+            if trace:
+                trace.debug(
+                    "%s %s",
+                    route,
+                    response.status,
+                    major=major or "-",
+                    remaining=lambda: response.headers.get("X-RateLimit-Remaining", "-")
+                )
+
+            if response.status != 429:
+                return response
+
+            data = {}
+            try:
+                data = await response.json(loads=self.client.codec.loads)
+                retry_after = float(data.get("retry_after", 1))
+            except Exception:
+                retry_after = float(response.headers.get("Retry-After", 1))
+            finally:
+                response.release()
+
+            if response.headers.get("X-RateLimit-Global") == "true" or data.get("global"):
+                self.logger.warning(
+                    f"Global rate limit hit on {route}, pausing all requests for {retry_after}s "
+                    f"(attempt {attempt + 1}/{self.max_retries})"
+                )
+                if trace:
+                    trace.info("Retrying after global 429", route=route, retry_after=retry_after, attempt=attempt + 1)
+                self.global_limiter.pause(retry_after)
+                continue
+
+            self.logger.warning(
+                f"Rate limited on {route} ({major or 'no major'}), retrying in {retry_after}s "
+                f"(attempt {attempt + 1}/{self.max_retries})"
+            )
+            if trace:
+                trace.info("Retrying after 429", route=route, major=major or "-", retry_after=retry_after, attempt=attempt + 1)
+            self.get_bucket(route, major).exhaust(retry_after)
+
+        raise Exception(f"Max attempts reached for {method} {url}")
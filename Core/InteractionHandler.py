@@ -14,7 +14,9 @@ class InteractionHandler:
         if command:
             try:
                 await command['func'](self.client, interaction)
-                self.console.print(f"[green]Received slash command: {command_name}[/green]")
+                trace = self.client.tracer.interactions
+                if trace:
+                    trace.info("Handled slash command %s", command_name)
             except Exception as e:
                 self.console.print(f"[red]Error executing command: {command_name}[/red]")
                 self.client.logger.error(f"Error executing command {command_name}: {e}")
@@ -34,8 +36,10 @@ class InteractionHandler:
             self.console.print(f"[red]No handler found for component with custom_id: {custom_id}[/red]")
 
     async def handle_interaction(self, interaction):
-        self.console.print(f"[cyan]Handling interaction: {interaction.get('type', 'N/A')}[/cyan]")
         interaction_type = interaction.get('type')
+        trace = self.client.tracer.interactions
+        if trace:
+            trace.debug("Handling interaction", type=interaction_type, id=interaction.get('id'))
 
         if not interaction_type:
             self.console.print("[red]Interaction type missing in payload.[/red]")
@@ -43,12 +47,12 @@ class InteractionHandler:
 
         if interaction_type == 2:
             command_name = interaction['data']['name']
-            self.console.print(f"[cyan]Received slash command: {command_name}[/cyan]")
             command = next((cmd for cmd in self.client.commands if cmd['name'] == command_name), None)
 
             if command:
                 try:
-                    self.console.print(f"[cyan]Executing command: {command_name}[/cyan]")
+                    if trace:
+                        trace.info("Executing command %s", command_name)
                     result_message = await command['func'](self.client, interaction)
                     if result_message:
                         await self.client.api_helper.send_interaction_response(
@@ -56,8 +60,8 @@ class InteractionHandler:
                             interaction["token"],
                             message=result_message
                         )
-                    else:
-                        self.console.print(f"[yellow]No response message for command {command_name}, skipping send.[/yellow]")
+                    elif trace:
+                        trace.debug("No response message for command %s, skipping send", command_name)
                 except Exception as e:
                     self.console.print(f"[red]Error while executing command {command_name}[/red]")
                     self.client.logger.error(f"Error while executing command {command_name}: {e}")
@@ -0,0 +1,61 @@
+import json
+from typing import Optional
+
+
+BACKENDS = ("orjson", "msgspec", "ujson", "json")
+
+
+class JSONCodec:
+    def __init__(self, backend: Optional[str] = None) -> None:
+        backends = (backend,) if backend else BACKENDS
+        for name in backends:
+            if self.load_backend(name):
+                self.name = name
+                break
+        else:
+            raise ValueError(f"JSON backend '{backend}' is not available")
+
+    def load_backend(self, name: str) -> bool:
+        if name == "orjson":
+            try:
+                import orjson
+            except ImportError:
+                return False
+            self.loads = orjson.loads
+            self.dumps = orjson.dumps
+            self.dumps_str = lambda obj: orjson.dumps(obj).decode("utf-8")
+            return True
+
+        if name == "msgspec":
+            try:
+                import msgspec
+            except ImportError:
+                return False
+            decoder = msgspec.json.Decoder()
+            encoder = msgspec.json.Encoder()
+            self.loads = decoder.decode
+            self.dumps = encoder.encode
+            self.dumps_str = lambda obj: encoder.encode(obj).decode("utf-8")
+            return True
+
+        if name == "ujson":
+            try:
+                import ujson
+            except ImportError:
+                return False
+            self.loads = ujson.loads
+            self.dumps = lambda obj: ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+            self.dumps_str = lambda obj: ujson.dumps(obj, ensure_ascii=False)
+            return True
+
+        if name == "json":
+            encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+            self.loads = json.loads
+            self.dumps = lambda obj: encoder.encode(obj).encode("utf-8")
+            self.dumps_str = encoder.encode
+            return True
+
+        return False
+
+    def __repr__(self) -> str:
+        return f"<JSONCodec backend={self.name}>"
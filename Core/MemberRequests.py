@@ -0,0 +1,85 @@
+import asyncio
+import secrets
+from typing import AsyncIterator, Dict, Iterable, Optional, Tuple
+
+from .Intents import Intents
+
+
+MAX_USER_IDS = 100
+
+
+class MemberRequests:
+    def __init__(self, client, timeout: float = 30.0) -> None:
+        self.client = client
+        self.timeout = timeout
+        self.pending: Dict[str, Tuple[asyncio.Queue, bool]] = {}
+
+    def handle_chunk(self, payload: dict) -> None:
+        entry = self.pending.get(payload.get("nonce"))
+        if entry is None or entry[1]:
+            self.client.cache.members_chunk(payload)
+        if entry is not None:
+            entry[0].put_nowait(payload)
+
+    async def stream(
+        self,
+        guild_id,
+        query: Optional[str] = None,
+        limit: int = 0,
+        user_ids: Optional[Iterable] = None,
+        presences: bool = False,
+        cache: bool = True,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[dict]:
+        if query is not None and user_ids is not None:
+            raise ValueError("Pass either query or user_ids, not both")
+        if user_ids is None and query is None:
+            query = ""
+
+        intents = self.client.intents
+        if query == "" and limit == 0 and not intents.has(Intents.GUILD_MEMBERS):
+            raise ValueError("Requesting every member requires the GUILD_MEMBERS intent")
+        if presences and not intents.has(Intents.GUILD_PRESENCES):
+            raise ValueError("Requesting presences requires the GUILD_PRESENCES intent")
+
+        shard = self.client.shard_manager.get_shard(guild_id)
+        if shard is None:
+            raise ValueError(f"Guild {guild_id} is not handled by any shard in this process")
+
+        if user_ids is None:
+            requests = [{"query": query, "limit": limit}]
+        else:
+            user_ids = [str(user_id) for user_id in user_ids]
+            requests = [
+                {"user_ids": user_ids[index:index + MAX_USER_IDS]}
+                for index in range(0, len(user_ids), MAX_USER_IDS)
+            ]
+
+        timeout = timeout or self.timeout
+        for request in requests:
+            nonce = secrets.token_hex(12)
+            queue: asyncio.Queue = asyncio.Queue()
+            self.pending[nonce] = (queue, cache)
+            try:
+                await shard.send({
+                    "op": 8,
+                    "d": {"guild_id": str(guild_id), "presences": presences, "nonce": nonce, **request}
+                })
+
+                while True:
+                    chunk = await asyncio.wait_for(queue.get(), timeout)
+                    trace = self.client.tracer.gateway
+                    if trace:
+                        trace.debug(
+                            "Received member chunk",
+                            guild=guild_id,
+                            nonce=nonce,
+                            chunk=lambda: f"{chunk.get('chunk_index', 0) + 1}/{chunk.get('chunk_count', 1)}",
+                            members=lambda: len(chunk.get("members", ()))
+                        )
+                    for member in chunk.get("members", ()):
+                        yield member
+                    if chunk.get("chunk_index", 0) + 1 >= chunk.get("chunk_count", 1):
+                        break
+            finally:
+                self.pending.pop(nonce, None)
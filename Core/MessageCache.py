@@ -0,0 +1,106 @@
+import copy
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from ..Resources.Message import Message
+
+
+class MessageCache:
+    def __init__(self, client, capacity: int = 1000, per_channel: int = 100) -> None:
+        self.client = client
+        self.capacity = capacity
+        self.per_channel = per_channel
+        self.messages: "OrderedDict[int, Message]" = OrderedDict()
+        # Per-channel rings stay in step with `messages`, so memory is bounded by `capacity`.
+        self.channels: Dict[int, "OrderedDict[int, None]"] = {}
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def __contains__(self, message_id) -> bool:
+        return int(message_id) in self.messages
+
+    def get(self, message_id) -> Optional[Message]:
+        message = self.messages.get(int(message_id))
+        self.counters["hits" if message is not None else "misses"] += 1
+        return message
+
+    def channel_messages(self, channel_id) -> List[Message]:
+        ring = self.channels.get(int(channel_id), ())
+        return [self.messages[message_id] for message_id in ring]
+
+    def add(self, message: Message) -> None:
+        if not self.capacity:
+            return
+        message_id = int(message.id)
+        channel_id = int(message.channel_id)
+        if message_id in self.messages:
+            self.messages[message_id] = message
+            return
+
+        ring = self.channels.get(channel_id)
+        if ring is None:
+            ring = self.channels[channel_id] = OrderedDict()
+        elif len(ring) >= self.per_channel:
+            self.evict(next(iter(ring)))
+        ring[message_id] = None
+
+        self.messages[message_id] = message
+        while len(self.messages) > self.capacity:
+            self.evict(next(iter(self.messages)))
+
+    def evict(self, message_id: int) -> None:
+        if self.remove(message_id) is not None:
+            self.counters["evictions"] += 1
+
+    def remove(self, message_id: int) -> Optional[Message]:
+        message = self.messages.pop(message_id, None)
+        if message is not None:
+            channel_id = int(message.channel_id)
+            ring = self.channels.get(channel_id)
+            if ring is not None:
+                ring.pop(message_id, None)
+                if not ring:
+                    del self.channels[channel_id]
+        return message
+
+    def pop(self, message_id) -> Optional[Message]:
+        return self.remove(int(message_id))
+
+    def clear_channel(self, channel_id) -> None:
+        for message_id in self.channels.pop(int(channel_id), ()):
+            self.messages.pop(message_id, None)
+
+    def clear(self) -> None:
+        self.messages.clear()
+        self.channels.clear()
+
+    def message_create(self, data: dict) -> None:
+        self.add(Message.from_payload(self.client, data))
+
+    def message_update(self, data: dict) -> None:
+        message = self.messages.get(int(data["id"]))
+        if message is None:
+            return
+        before = copy.copy(message)
+        message.update(data)
+        if "on_message_edit" in self.client.events:
+            self.client.events.dispatch("on_message_edit", before, message)
+
+    def message_delete(self, data: dict) -> None:
+        message = self.pop(data["id"])
+        if message is not None and "on_cached_message_delete" in self.client.events:
+            self.client.events.dispatch("on_cached_message_delete", message)
+
+    def message_delete_bulk(self, data: dict) -> None:
+        for message_id in data.get("ids", ()):
+            self.message_delete({"id": message_id})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "messages": len(self.messages),
+            "channels": len(self.channels),
+            "capacity": self.capacity,
+            **self.counters,
+        }
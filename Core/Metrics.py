@@ -0,0 +1,55 @@
+import bisect
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+
+DEFAULT_BUCKETS = (25, 50, 75, 100, 150, 200, 300, 500, 750, 1000, 2000, 5000)
+
+
+class LatencyHistogram:
+    def __init__(self, window: int = 100, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.samples = deque(maxlen=window)
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+
+    def record(self, value: float) -> None:
+        if len(self.samples) == self.samples.maxlen:
+            self.counts[bisect.bisect_left(self.buckets, self.samples[0])] -= 1
+        self.samples.append(value)
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    @property
+    def last(self) -> Optional[float]:
+        return self.samples[-1] if self.samples else None
+
+    @property
+    def average(self) -> Optional[float]:
+        return sum(self.samples) / len(self.samples) if self.samples else None
+
+    def percentile(self, percent: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def histogram(self) -> Dict[str, int]:
+        result = {}
+        for index, count in enumerate(self.counts):
+            label = f"<={self.buckets[index]}" if index < len(self.buckets) else f">{self.buckets[-1]}"
+            result[label] = count
+        return result
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": len(self.samples),
+            "last": self.last,
+            "average": self.average,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": max(self.samples) if self.samples else None,
+        }
@@ -0,0 +1,91 @@
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+
+def item_id(item: dict) -> int:
+    return int(item["id"])
+
+
+def user_id(item: dict) -> int:
+    return int(item["user"]["id"])
+
+
+class Paginator:
+    def __init__(
+        self,
+        client,
+        url: str,
+        page_size: int,
+        direction: str = "after",
+        cursor=None,
+        limit: Optional[int] = None,
+        key: Callable[[dict], int] = item_id,
+        extract: Optional[Callable[[Any], List[dict]]] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> None:
+        if direction not in ("after", "before"):
+            raise ValueError("direction must be 'after' or 'before'")
+        self.client = client
+        self.url = url
+        self.page_size = page_size
+        self.direction = direction
+        self.cursor = cursor
+        self.limit = limit
+        self.key = key
+        self.extract = extract
+        self.params = params or {}
+
+    def __aiter__(self) -> AsyncIterator[dict]:
+        return self.iterate()
+
+    async def fetch(self, cursor, size: int) -> List[dict]:
+        params = {**self.params, "limit": size}
+        if cursor is not None:
+            params[self.direction] = str(cursor)
+        headers = {"Authorization": f"Bot {self.client.token}"}
+
+        async with self.client.http.get(self.url, headers=headers, params=params) as response:
+            if response.status != 200:
+                raise Exception(f"Failed to fetch page from {self.url}: {response.status} {await response.text()}")
+            data = await response.json(loads=self.client.codec.loads)
+        return self.extract(data) if self.extract else data
+
+    def next_cursor(self, page: List[dict]) -> int:
+        keys = [self.key(item) for item in page]
+        return max(keys) if self.direction == "after" else min(keys)
+
+    def next_size(self, remaining: Optional[int]) -> int:
+        return self.page_size if remaining is None else min(self.page_size, remaining)
+
+    async def iterate(self) -> AsyncIterator[dict]:
+        remaining = self.limit
+        if remaining is not None and remaining <= 0:
+            return
+
+        size = self.next_size(remaining)
+        pending = asyncio.ensure_future(self.fetch(self.cursor, size))
+        try:
+            while pending is not None:
+                page = await pending
+                pending = None
+                if not page:
+                    return
+                if remaining is not None:
+                    page = page[:remaining]
+                    remaining -= len(page)
+
+                # Request the next page before handing this one to the caller.
+                if len(page) >= size and (remaining is None or remaining > 0):
+                    size = self.next_size(remaining)
+                    pending = asyncio.ensure_future(self.fetch(self.next_cursor(page), size))
+
+                for item in page:
+                    yield item
+        finally:
+            if pending is not None:
+                if pending.done() and not pending.cancelled():
+                    pending.exception()
+                pending.cancel()
+
+    async def flatten(self) -> List[dict]:
+        return [item async for item in self]
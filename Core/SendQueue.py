@@ -0,0 +1,133 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+
+class GatewaySendQueue:
+    def __init__(
+        self,
+        writer: Callable[[dict], Awaitable[None]],
+        limit: int = 120,
+        per: float = 60.0,
+        reserved: int = 3
+    ) -> None:
+        self.writer = writer
+        self.limit = limit
+        self.per = per
+        self.reserved = reserved
+        self.sent: Deque[float] = deque()
+        self.pending: Deque[Tuple[dict, asyncio.Future, bool]] = deque()
+        self.opened = False
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def start(self) -> None:
+        # The budget is per connection, and nothing but IDENTIFY/RESUME may go out before them.
+        self.sent.clear()
+        self.opened = False
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task and not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.task = None
+        self.drop_priority(ConnectionResetError("Gateway connection closed"))
+
+    def close(self, exc: Optional[BaseException] = None) -> None:
+        exc = exc or ConnectionResetError("Gateway send queue closed")
+        while self.pending:
+            _, future, _ = self.pending.popleft()
+            if not future.done():
+                future.set_exception(exc)
+
+    def drop_priority(self, exc: BaseException) -> None:
+        # IDENTIFY/RESUME belong to the connection they were queued for.
+        for item in [item for item in self.pending if item[2]]:
+            self.pending.remove(item)
+            if not item[1].done():
+                item[1].set_exception(exc)
+
+    async def put(self, payload: dict, priority: bool = False) -> None:
+        future = asyncio.get_running_loop().create_future()
+        if priority:
+            self.pending.appendleft((payload, future, True))
+        else:
+            self.pending.append((payload, future, False))
+        self.wakeup.set()
+        await future
+
+    async def send_now(self, payload: dict) -> None:
+        # Bypasses the queue; `reserved` leaves room in the budget for these sends.
+        await self.writer(payload)
+
+    def record(self, now: float) -> None:
+        self.sent.append(now)
+        self.prune(now)
+
+    def prune(self, now: float) -> None:
+        while self.sent and self.sent[0] <= now - self.per:
+            self.sent.popleft()
+
+    def delay(self, now: float) -> float:
+        self.prune(now)
+        capacity = self.limit - self.reserved
+        if len(self.sent) < capacity:
+            return 0.0
+        return self.sent[len(self.sent) - capacity] + self.per - now
+
+    def ready(self) -> bool:
+        while self.pending and self.pending[0][1].done():
+            self.pending.popleft()
+        return bool(self.pending) and (self.opened or self.pending[0][2])
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.ready():
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+
+            delay = self.delay(loop.time())
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            item = self.pending.popleft()
+            payload, future, priority = item
+            self.record(loop.time())
+            try:
+                await self.writer(payload)
+            except asyncio.CancelledError:
+                self.pending.appendleft(item)
+                raise
+            except ConnectionError as e:
+                self.pending.appendleft(item)
+                self.drop_priority(e)
+                return
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+
+            if priority:
+                self.opened = True
+            if not future.done():
+                future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        if self.task:
+            self.prune(asyncio.get_running_loop().time())
+        return {
+            "pending": len(self.pending),
+            "sent_in_window": len(self.sent),
+            "limit": self.limit,
+            "reserved": self.reserved,
+        }
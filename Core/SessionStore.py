@@ -0,0 +1,64 @@
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+
+class SessionStore:
+    def __init__(self, path: str, max_age: float = 300) -> None:
+        self.path = path
+        self.max_age = max_age
+        self.logger = logging.getLogger("SessionStore")
+
+    def shard_path(self, shard_id: int) -> str:
+        return os.path.join(self.path, f"shard_{shard_id}.json")
+
+    def load(self, shard_id: int, total_shards: int) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.shard_path(shard_id), "r", encoding="utf-8") as file:
+                state = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable session checkpoint for shard {shard_id}: {e}")
+            return None
+
+        if state.get("total_shards") != total_shards:
+            return None
+        if time.time() - state.get("saved_at", 0) > self.max_age:
+            return None
+        if not state.get("session_id") or not state.get("resume_gateway_url") or state.get("sequence") is None:
+            return None
+        return state
+
+    def save(self, shard_id: int, total_shards: int, session_id: str, resume_gateway_url: str, sequence: int) -> None:
+        state = {
+            "shard_id": shard_id,
+            "total_shards": total_shards,
+            "session_id": session_id,
+            "resume_gateway_url": resume_gateway_url,
+            "sequence": sequence,
+            "saved_at": time.time(),
+        }
+        os.makedirs(self.path, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=f".shard_{shard_id}.", dir=self.path)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(state, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.shard_path(shard_id))
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def clear(self, shard_id: int) -> None:
+        try:
+            os.unlink(self.shard_path(shard_id))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import signal
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+from rich.console import Console
+from rich.progress import Progress, SpinnerColumn, TextColumn
+
+from .WebSocket import WebSocketManager
+
+
+class IdentifyLimiter:
+    def __init__(self, max_concurrency: int = 1, interval: float = 5.0) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.interval = interval
+        self.locks: Dict[int, asyncio.Lock] = {}
+        self.last_identify: Dict[int, float] = {}
+
+    async def acquire(self, shard_id: int) -> None:
+        key = shard_id % self.max_concurrency
+        lock = self.locks.get(key)
+        if lock is None:
+            lock = self.locks[key] = asyncio.Lock()
+
+        loop = asyncio.get_running_loop()
+        async with lock:
+            last = self.last_identify.get(key)
+            if last is not None:
+                delay = last + self.interval - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self.last_identify[key] = loop.time()
+
+
+class ShardManager:
+    def __init__(
+        self,
+        client,
+        shard_ids: Optional[Iterable[int]] = None,
+        total_shards: Optional[int] = None
+    ) -> None:
+        self.client = client
+        self.shard_ids = list(shard_ids) if shard_ids is not None else None
+        self.total_shards = total_shards
+        self.max_concurrency = 1
+        self.identify_limiter: Optional[Any] = None
+        self.shards: Dict[int, WebSocketManager] = {}
+        self.console = Console()
+        self.logger = logging.getLogger("ShardManager")
+
+    async def fetch_gateway_bot(self) -> Optional[Dict[str, Any]]:
+        url = f"{self.client.base_url}/gateway/bot"
+        headers = {"Authorization": f"Bot {self.client.token}"}
+        try:
+            async with self.client.http.get(url, headers=headers) as response:
+                if response.status == 200:
+                    return await response.json(loads=self.client.codec.loads)
+                self.logger.error(f"Failed to fetch gateway info: {response.status} {await response.text()}")
+        except Exception as e:
+            self.logger.error(f"Error while fetching gateway info: {e}")
+        return None
+
+    async def configure(self) -> None:
+        info = None
+        if self.total_shards is None or self.identify_limiter is None:
+            info = await self.fetch_gateway_bot()
+        if info:
+            self.client.gateway_url = self.client.build_gateway_url(info["url"])
+            if self.total_shards is None:
+                self.total_shards = info.get("shards", 1)
+            session_start_limit = info.get("session_start_limit", {})
+            self.max_concurrency = session_start_limit.get("max_concurrency", 1)
+            self.logger.info(
+                f"Gateway recommends {info.get('shards')} shards, max_concurrency={self.max_concurrency}, "
+                f"remaining sessions={session_start_limit.get('remaining')}"
+            )
+
+        if self.total_shards is None:
+            self.total_shards = 1
+        if self.shard_ids is None:
+            self.shard_ids = list(range(self.total_shards))
+        if self.identify_limiter is None:
+            self.identify_limiter = IdentifyLimiter(self.max_concurrency)
+
+    def create_shards(self) -> List[WebSocketManager]:
+        primary = self.client.websocket_manager
+        for shard_id in self.shard_ids:
+            if primary is not None and primary.shard_id == shard_id and shard_id not in self.shards:
+                shard = primary
+                shard.total_shards = self.total_shards
+            else:
+                shard = self.shards.get(shard_id) or WebSocketManager(self.client, shard_id, self.total_shards)
+            shard.identify_limiter = self.identify_limiter
+            if self.client.session_store is not None and not shard.can_resume():
+                shard.restore_session(self.client.session_store)
+            self.shards[shard_id] = shard
+
+        self.client.websocket_manager = self.shards[self.shard_ids[0]]
+        return [self.shards[shard_id] for shard_id in self.shard_ids]
+
+    def install_signal_handlers(self) -> None:
+        try:
+            if sys.platform != "win32":
+                loop = asyncio.get_running_loop()
+                loop.add_signal_handler(signal.SIGINT, self.graceful_shutdown, signal.SIGINT, None)
+                loop.add_signal_handler(signal.SIGTERM, self.graceful_shutdown, signal.SIGTERM, None)
+            else:
+                signal.signal(signal.SIGINT, self.graceful_shutdown)
+                signal.signal(signal.SIGTERM, self.graceful_shutdown)
+        except Exception as e:
+            self.logger.error(f"Error setting up signal handlers: {e}")
+
+    async def start(self) -> None:
+        await self.configure()
+        shards = self.create_shards()
+        self.install_signal_handlers()
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=self.console,
+            transient=False,
+            refresh_per_second=5
+        ) as progress:
+            progress.console.log(
+                f"[cyan]Starting shards {self.shard_ids[0]}-{self.shard_ids[-1]} "
+                f"of {self.total_shards} (max_concurrency={self.max_concurrency})[/cyan]"
+            )
+            await asyncio.gather(*(shard.connect(progress) for shard in shards))
+
+    def shard_for_guild(self, guild_id) -> int:
+        return (int(guild_id) >> 22) % (self.total_shards or 1)
+
+    def get_shard(self, guild_id) -> Optional[WebSocketManager]:
+        return self.shards.get(self.shard_for_guild(guild_id))
+
+    @property
+    def latencies(self) -> Dict[int, Optional[float]]:
+        return {shard_id: shard.latency for shard_id, shard in self.shards.items()}
+
+    def status(self) -> Dict[int, Dict[str, Any]]:
+        return {shard_id: shard.status() for shard_id, shard in self.shards.items()}
+
+    def graceful_shutdown(self, signum, frame) -> None:
+        for shard in self.shards.values():
+            shard.graceful_shutdown(signum, frame)
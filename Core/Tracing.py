@@ -0,0 +1,102 @@
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+
+CATEGORIES = ("gateway", "heartbeat", "dispatch", "interactions", "commands", "http")
+
+
+class TraceCategory:
+    __slots__ = ("tracer", "name", "level", "every", "counter")
+
+    def __init__(self, tracer: "Tracer", name: str, level: int, sample_rate: float) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.level = level
+        self.every = max(1, round(1 / sample_rate)) if sample_rate > 0 else 0
+        self.counter = 0
+
+    def emit(self, level: int, message: str, *args: Any, **fields: Any) -> None:
+        if level < self.level or not self.every:
+            return
+        if self.every > 1:
+            self.counter += 1
+            if self.counter % self.every:
+                return
+
+        if args:
+            message = message % tuple(arg() if callable(arg) else arg for arg in args)
+        if fields:
+            message += " " + " ".join(
+                f"{key}={value() if callable(value) else value}" for key, value in fields.items()
+            )
+        self.tracer.sink(self.name, level, message)
+
+    def debug(self, message: str, *args: Any, **fields: Any) -> None:
+        self.emit(logging.DEBUG, message, *args, **fields)
+
+    def info(self, message: str, *args: Any, **fields: Any) -> None:
+        self.emit(logging.INFO, message, *args, **fields)
+
+    def warning(self, message: str, *args: Any, **fields: Any) -> None:
+        self.emit(logging.WARNING, message, *args, **fields)
+
+    def error(self, message: str, *args: Any, **fields: Any) -> None:
+        self.emit(logging.ERROR, message, *args, **fields)
+
+
+class Tracer:
+    def __init__(
+        self,
+        categories: Optional[Iterable[str]] = None,
+        level: str = "debug",
+        sample_rates: Optional[Dict[str, float]] = None,
+        sink: Optional[Callable[[str, int, str], None]] = None
+    ) -> None:
+        self.logger = logging.getLogger("PaulCord.trace")
+        self.sink = sink or self.log
+        self.default_level = LEVELS[level]
+        sample_rates = sample_rates or {}
+
+        for category in CATEGORIES:
+            setattr(self, category, None)
+        for category in categories or ():
+            self.enable(category, sample_rate=sample_rates.get(category, 1.0))
+
+    def enable(self, category: str, level: Optional[str] = None, sample_rate: float = 1.0) -> TraceCategory:
+        trace = TraceCategory(
+            self,
+            category,
+            LEVELS[level] if level else self.default_level,
+            sample_rate
+        )
+        setattr(self, category, trace)
+        if self.sink == self.log:
+            self.prepare_logger()
+        return trace
+
+    def prepare_logger(self) -> None:
+        # Category levels do the filtering, so the default sink must not drop what they let through.
+        self.logger.setLevel(logging.DEBUG)
+        if not self.logger.handlers and not logging.getLogger().handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+            self.logger.addHandler(handler)
+
+    def disable(self, category: str) -> None:
+        setattr(self, category, None)
+
+    def enabled(self) -> Dict[str, TraceCategory]:
+        return {
+            name: trace for name, trace in vars(self).items()
+            if isinstance(trace, TraceCategory)
+        }
+
+    def log(self, category: str, level: int, message: str) -> None:
+        self.logger.log(level, f"[{category}] {message}")
@@ -1,17 +1,28 @@
 import asyncio
 import aiohttp
+import inspect
 import time
-import signal
 import logging
 import random
-import sys
-from typing import Optional
+import zlib
+from typing import Optional, Set
 import json
 
+from . import ETF
+from .Metrics import LatencyHistogram
+from .SendQueue import GatewaySendQueue
+from .Events import build_event_payload, event_name
+
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 
+ZLIB_SUFFIX = b"\x00\x00\xff\xff"
+FATAL_CLOSE_CODES = {4004, 4010, 4011, 4012, 4013, 4014}
+SESSION_INVALID_CLOSE_CODES = {4007, 4009}
+WS_DECODE_TEXT = "decode_text" in inspect.signature(aiohttp.ClientSession.ws_connect).parameters
+
+
 def truncate_json(data: dict, max_length: int = 300) -> str:
     raw_str = json.dumps(data, indent=2, ensure_ascii=False)
     if len(raw_str) > max_length:
@@ -29,161 +40,262 @@ class WebSocketManager:
         self.reconnect_attempts: int = 0
         self.max_reconnect_attempts: Optional[int] = 5
         self.reconnect_interval: int = 5
-        self.max_heartbeat_failures: int = 5
-        self.failed_heartbeats: int = 0
         self.session: Optional[aiohttp.ClientSession] = None
         self.heartbeat_task: Optional[asyncio.Task] = None
+        self.handshake_task: Optional[asyncio.Task] = None
+        self.handshake_sent: bool = False
+        self.tasks: Set[asyncio.Task] = set()
+        self.ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self.sequence: Optional[int] = None
+        self.session_id: Optional[str] = None
+        self.resume_gateway_url: Optional[str] = None
+        self.heartbeat_interval: Optional[float] = None
+        self.last_heartbeat_ack: bool = True
+        self.hello_received = asyncio.Event()
+        self.latency_histogram = LatencyHistogram()
+        self.send_queue = GatewaySendQueue(self.write)
+        self.state: str = "disconnected"
+        self.fatal_close_code: Optional[int] = None
+        self.identify_limiter = None
+        self.inflator = None
+        self.buffer = bytearray()
 
         self.logger = logging.getLogger(f"WebSocketManager_{shard_id}")
         self.logger.setLevel(logging.INFO)
-        handler = logging.FileHandler(f"websocket_shard_{shard_id}.log")
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
+        if not self.logger.handlers:
+            handler = logging.FileHandler(f"websocket_shard_{shard_id}.log")
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handler.setFormatter(formatter)
+            self.logger.addHandler(handler)
 
         self.console = Console()
 
         self.progress: Optional[Progress] = None
         self.progress_task_id: Optional[int] = None
 
-        try:
-            loop = asyncio.get_event_loop()
-            if sys.platform != "win32":
-                loop.add_signal_handler(signal.SIGINT, self.graceful_shutdown, signal.SIGINT, None)
-                loop.add_signal_handler(signal.SIGTERM, self.graceful_shutdown, signal.SIGTERM, None)
-            else:
-                signal.signal(signal.SIGINT, self.graceful_shutdown)
-                signal.signal(signal.SIGTERM, self.graceful_shutdown)
-        except Exception as e:
-            self.logger.error(f"Error setting up signal handlers: {e}")
+    @property
+    def latency(self) -> Optional[float]:
+        return self.last_ping
 
     async def init_session(self) -> None:
-        self.session = aiohttp.ClientSession()
+        self.session = await self.client.http.start()
 
     async def close(self) -> None:
-        if self.session:
-            await self.session.close()
+        if self.ws and not self.ws.closed:
+            await self.ws.close()
 
     async def heartbeat(self) -> None:
-        while self.client.running:
-            if self.client.heartbeat_interval is None:
-                await asyncio.sleep(5)
-                continue
-
-            current_time = time.time()
-            if self.ping_timestamp and (current_time - self.ping_timestamp) < (self.client.heartbeat_interval / 1000):
-                await asyncio.sleep(1)
-                continue
-
-            self.client.ping_timestamp = current_time
-
-            if not self.client.last_heartbeat_ack:
-                self.failed_heartbeats += 1
+        await self.hello_received.wait()
+        loop = asyncio.get_running_loop()
+        interval = self.heartbeat_interval / 1000
+        next_beat = loop.time() + interval * random.random()
+        self.last_heartbeat_ack = True
+
+        while self.client.running and self.ws and not self.ws.closed:
+            delay = next_beat - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_beat += interval
+
+            # Before IDENTIFY/RESUME is out, a missing ACK may just be a slow handshake.
+            if not self.last_heartbeat_ack and self.handshake_sent:
+                self.logger.warning(
+                    f"Shard {self.shard_id}: No heartbeat ACK within {interval:.1f}s, "
+                    f"closing zombied connection to resume."
+                )
                 if self.progress:
                     self.progress.console.log(
-                        f"[yellow]Shard {self.shard_id}: Heartbeat timeout "
-                        f"({self.failed_heartbeats}/{self.max_heartbeat_failures}). Reconnecting...[/yellow]"
+                        f"[yellow]Shard {self.shard_id}: Heartbeat ACK missed. Reconnecting...[/yellow]"
                     )
+                try:
+                    await self.ws.close(code=4000)
+                except Exception as e:
+                    self.logger.error(f"Shard {self.shard_id}: Error closing WebSocket connection: {e}")
+                return
 
-                self.logger.warning(
-                    f"Shard {self.shard_id}: Heartbeat timeout "
-                    f"({self.failed_heartbeats}/{self.max_heartbeat_failures})."
-                )
+            try:
+                await self.send_heartbeat()
+            except Exception as e:
+                self.logger.error(f"Shard {self.shard_id}: Error sending heartbeat: {e}")
+                return
 
-                if self.failed_heartbeats >= self.max_heartbeat_failures:
-                    if self.client.ws:
-                        try:
-                            await self.client.ws.close()
-                        except Exception as e:
-                            self.logger.error(f"Shard {self.shard_id}: Error closing WebSocket connection: {e}")
-                    break
+    async def send_heartbeat(self) -> None:
+        payload = {
+            "op": 1,
+            "d": self.sequence
+        }
+        self.last_heartbeat_ack = False
+        self.ping_timestamp = time.perf_counter()
+        await self.send_queue.send_now(payload)
 
-            self.failed_heartbeats = 0
-            self.client.last_heartbeat_ack = False
-            self.ping_timestamp = current_time
+        trace = self.client.tracer.heartbeat
+        if trace:
+            trace.debug("Sent heartbeat", shard=self.shard_id, sequence=self.sequence)
 
-            payload = {
-                "op": 1,
-                "d": self.client.sequence if self.client.sequence is not None else 0
-            }
+    def handle_heartbeat_ack(self) -> None:
+        self.last_heartbeat_ack = True
+        if self.ping_timestamp is None:
+            return
+        self.last_ping = (time.perf_counter() - self.ping_timestamp) * 1000
+        self.latency_histogram.record(self.last_ping)
 
-            if self.client.ws:
-                try:
-                    await self.client.ws.send_json(payload)
-                    if self.progress:
-                        self.progress.console.log(
-                            f"[cyan]Shard {self.shard_id}: Sending heartbeat with sequence: {self.client.sequence}[/cyan]"
-                        )
-                    await asyncio.sleep(self.client.heartbeat_interval / 1000)
-                    if self.client.last_heartbeat_ack:
-                        self.client.last_ping = (time.time() - self.client.ping_timestamp) * 1000
-                except Exception as e:
-                    self.logger.error(f"Shard {self.shard_id}: Error sending heartbeat: {e}")
-                    break
+        trace = self.client.tracer.heartbeat
+        if trace:
+            trace.debug("Received heartbeat ACK", shard=self.shard_id, latency=f"{self.last_ping:.1f}ms")
 
-    async def connect(self) -> None:
+    async def connect(self, progress: Optional[Progress] = None) -> None:
         if self.session is None:
             await self.init_session()
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=self.console,
-            transient=False,
-            refresh_per_second=5
-        ) as progress:
-            self.progress = progress
-            self.progress_task_id = progress.add_task(
-                f"Shard {self.shard_id} - Listening for WebSocket messages",
-                total=None
-            )
-
-            while self.client.running and (
-                self.reconnect_attempts < self.max_reconnect_attempts
-                or self.max_reconnect_attempts is None
-            ):
-                try:
-                    async with self.session.ws_connect(self.client.gateway_url) as ws:
-                        self.client.ws = ws
-                        self.reconnect_attempts = 0
-                        await self.identify()
-
-                        self.heartbeat_task = asyncio.create_task(self.heartbeat())
-
+        if progress is None:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=self.console,
+                transient=False,
+                refresh_per_second=5
+            ) as progress:
+                await self.run(progress)
+                progress.stop()
+        else:
+            await self.run(progress)
+
+    async def run(self, progress: Progress) -> None:
+        self.progress = progress
+        self.progress_task_id = progress.add_task(
+            f"Shard {self.shard_id} - Listening for WebSocket messages",
+            total=None
+        )
+
+        while self.client.running and (
+            self.max_reconnect_attempts is None
+            or self.reconnect_attempts < self.max_reconnect_attempts
+        ):
+            try:
+                self.state = "connecting"
+                ws_options = {"decode_text": False} if WS_DECODE_TEXT else {}
+                async with self.session.ws_connect(self.gateway_url(), **ws_options) as ws:
+                    self.ws = ws
+                    self.reconnect_attempts = 0
+                    self.heartbeat_interval = None
+                    self.ping_timestamp = None
+                    self.hello_received.clear()
+                    self.handshake_sent = False
+                    self.reset_inflator()
+
+                    self.send_queue.start()
+                    self.heartbeat_task = asyncio.create_task(self.heartbeat())
+                    try:
                         progress.update(
                             self.progress_task_id,
                             description=f"Shard {self.shard_id}: Connected. Listening..."
                         )
 
                         await self.listen()
-
-                        if self.heartbeat_task and not self.heartbeat_task.done():
-                            self.heartbeat_task.cancel()
-                            try:
-                                await self.heartbeat_task
-                            except asyncio.CancelledError:
-                                pass
-
-                except aiohttp.ClientConnectionError as e:
-                    self.reconnect_attempts += 1
-                    retry_delay = min(self.reconnect_interval * (2 ** (self.reconnect_attempts - 1)), 60)
+                    finally:
+                        for task in (self.handshake_task, self.heartbeat_task):
+                            if task and not task.done():
+                                task.cancel()
+                                try:
+                                    await task
+                                except asyncio.CancelledError:
+                                    pass
+                        await self.send_queue.stop()
+
+                if ws.close_code in FATAL_CLOSE_CODES:
+                    self.fatal_close_code = ws.close_code
+                    self.logger.error(f"Shard {self.shard_id}: Gateway closed with fatal code {ws.close_code}.")
                     progress.console.log(
-                        f"[yellow]WebSocket connection error: {e}. "
-                        f"Attempting reconnect ({self.reconnect_attempts}/{self.max_reconnect_attempts}) "
-                        f"in {retry_delay} seconds.[/yellow]"
+                        f"[red]Shard {self.shard_id}: Gateway closed with fatal code {ws.close_code}. "
+                        f"Not reconnecting.[/red]"
                     )
-                    await asyncio.sleep(retry_delay + random.uniform(0, 2))
-                except asyncio.TimeoutError as e:
-                    self.logger.error(f"WebSocket connection timed out: {e}")
-                    await asyncio.sleep(5)
-                except ConnectionResetError as e:
-                    self.logger.error(f"WebSocket connection reset: {e}")
-                    await asyncio.sleep(5)
-                except Exception as e:
-                    self.logger.error(f"Unexpected error during WebSocket connection: {e}")
-                    await asyncio.sleep(5)
+                    break
+                if ws.close_code in SESSION_INVALID_CLOSE_CODES:
+                    self.invalidate_session()
+
+            except aiohttp.ClientConnectionError as e:
+                self.reconnect_attempts += 1
+                retry_delay = min(self.reconnect_interval * (2 ** (self.reconnect_attempts - 1)), 60)
+                progress.console.log(
+                    f"[yellow]Shard {self.shard_id}: WebSocket connection error: {e}. "
+                    f"Attempting reconnect ({self.reconnect_attempts}/{self.max_reconnect_attempts}) "
+                    f"in {retry_delay} seconds.[/yellow]"
+                )
+                await asyncio.sleep(retry_delay + random.uniform(0, 2))
+            except asyncio.TimeoutError as e:
+                self.logger.error(f"WebSocket connection timed out: {e}")
+                await asyncio.sleep(5)
+            except ConnectionResetError as e:
+                self.logger.error(f"WebSocket connection reset: {e}")
+                await asyncio.sleep(5)
+            except Exception as e:
+                self.logger.error(f"Unexpected error during WebSocket connection: {e}")
+                await asyncio.sleep(5)
+            finally:
+                self.state = "disconnected"
 
-            progress.stop()
+        await self.send_queue.stop()
+        self.send_queue.close()
+
+    def gateway_url(self) -> str:
+        if self.can_resume():
+            return self.client.build_gateway_url(self.resume_gateway_url)
+        return self.client.gateway_url
+
+    def can_resume(self) -> bool:
+        return bool(self.session_id and self.resume_gateway_url and self.sequence is not None)
+
+    def invalidate_session(self) -> None:
+        self.session_id = None
+        self.resume_gateway_url = None
+        self.sequence = None
+
+    async def resume(self) -> None:
+        payload = {
+            "op": 6,
+            "d": {
+                "token": self.client.token,
+                "session_id": self.session_id,
+                "seq": self.sequence
+            }
+        }
+        self.state = "resuming"
+        if self.progress:
+            self.progress.console.log(
+                f"[cyan]Shard {self.shard_id}: Resuming session {self.session_id} at sequence {self.sequence}[/cyan]"
+            )
+        try:
+            if self.ws:
+                await self.send(payload, priority=True)
+                self.handshake_sent = True
+        except Exception as e:
+            self.logger.error(f"Shard {self.shard_id}: Error sending resume payload: {e}")
+
+    def start_handshake(self, delay: float = 0.0) -> None:
+        # Waiting for an identify slot must not block the receive loop, or heartbeat ACKs go unread.
+        if self.handshake_task and not self.handshake_task.done():
+            self.handshake_task.cancel()
+        self.handshake_sent = False
+        self.handshake_task = asyncio.create_task(self.handshake(delay))
+
+    async def handshake(self, delay: float = 0.0) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        if self.can_resume():
+            await self.resume()
+        else:
+            await self.identify()
+
+    async def handle_hello(self, payload: dict) -> None:
+        self.heartbeat_interval = payload['heartbeat_interval']
+        self.hello_received.set()
+        self.start_handshake()
+
+    async def handle_invalid_session(self, resumable: bool) -> None:
+        self.logger.warning(f"Shard {self.shard_id}: Session invalidated (resumable={resumable}).")
+        if not resumable:
+            self.invalidate_session()
+        self.start_handshake(random.uniform(1, 5))
 
     async def identify(self) -> None:
         payload = {
@@ -199,50 +311,147 @@ class WebSocketManager:
                 "shard": [self.shard_id, self.total_shards]
             }
         }
+        if self.identify_limiter is not None:
+            await self.identify_limiter.acquire(self.shard_id)
+
+        self.state = "identifying"
         if self.progress:
             self.progress.console.log(
                 f"[cyan]Shard {self.shard_id}: Sending identify payload (token hidden)[/cyan]"
             )
         try:
-            if self.client.ws:
-                await self.client.ws.send_json(payload)
+            if self.ws:
+                await self.send(payload, priority=True)
+                self.handshake_sent = True
         except Exception as e:
             self.logger.error(f"Shard {self.shard_id}: Error sending identify payload: {e}")
 
+    async def send(self, payload: dict, priority: bool = False) -> None:
+        await self.send_queue.put(payload, priority=priority)
+
+    async def write(self, payload: dict) -> None:
+        if self.ws is None or self.ws.closed:
+            raise ConnectionResetError("Gateway connection is closed")
+        if self.client.encoding == "etf":
+            await self.ws.send_bytes(ETF.encode(payload))
+        else:
+            await self.ws.send_str(self.client.codec.dumps_str(payload))
+
+    def reset_inflator(self) -> None:
+        self.inflator = zlib.decompressobj() if self.client.compress else None
+        self.buffer = bytearray()
+
     async def handle_text_message(self, msg: aiohttp.WSMessage) -> None:
         try:
-            data = msg.json()
-            truncated_data = truncate_json(data, max_length=200)
+            data = self.client.codec.loads(msg.data)
+        except Exception as e:
+            self.logger.error(f"Error while decoding WebSocket text message: {e}")
+            return
+        await self.handle_payload(data)
+
+    async def handle_binary_message(self, msg: aiohttp.WSMessage) -> None:
+        if self.inflator is None:
+            raw = msg.data
+        else:
+            self.buffer.extend(msg.data)
+            if len(msg.data) < 4 or msg.data[-4:] != ZLIB_SUFFIX:
+                return
+
+            try:
+                raw = self.inflator.decompress(self.buffer)
+            except zlib.error as e:
+                self.logger.error(f"Error while inflating WebSocket message: {e}")
+                self.buffer = bytearray()
+                return
+            self.buffer = bytearray()
+
+        try:
+            data = ETF.decode(raw) if self.client.encoding == "etf" else self.client.codec.loads(raw)
+        except Exception as e:
+            self.logger.error(f"Error while decoding WebSocket binary message: {e}")
+            return
+        await self.handle_payload(data)
 
+    async def handle_payload(self, data: dict) -> None:
+        try:
             if self.progress and self.progress_task_id is not None:
                 self.progress.update(self.progress_task_id, advance=1)
-                self.progress.console.log(f"[cyan]Received WebSocket message: {truncated_data}[/cyan]")
 
-            if 'd' in data and data.get('t') == 'INTERACTION_CREATE':
-                await self.client.interaction_handler.handle_interaction(data['d'])
-            else:
-                event_type = data.get('t')
-                if self.progress:
-                    self.progress.console.log(f"[dim]Skipping non-interaction message. Event: {event_type}[/dim]")
+            trace = self.client.tracer.gateway
+            if trace:
+                trace.debug(
+                    "Received WebSocket message: %s",
+                    lambda: truncate_json(data, max_length=200),
+                    shard=self.shard_id,
+                    op=data.get('op'),
+                    t=data.get('t')
+                )
+
+            op = data.get('op')
+            if op == 0:
+                await self.handle_dispatch(data)
+            elif op == 11:
+                self.handle_heartbeat_ack()
+            elif op == 1:
+                await self.send_heartbeat()
+            elif op == 10:
+                await self.handle_hello(data['d'])
+            elif op == 7:
+                self.logger.info(f"Shard {self.shard_id}: Gateway requested reconnect.")
+                await self.ws.close(code=4000)
+            elif op == 9:
+                await self.handle_invalid_session(bool(data.get('d')))
+        except Exception as e:
+            self.logger.error(f"Error while processing WebSocket message: {e}")
+
+    async def handle_dispatch(self, data: dict) -> None:
+        if data.get('s') is not None:
+            self.sequence = data['s']
+
+        event_type = data.get('t')
+        payload = data.get('d')
+
+        if event_type == 'READY':
+            self.state = "ready"
+            self.session_id = payload.get('session_id')
+            self.resume_gateway_url = payload.get('resume_gateway_url')
+        elif event_type == 'RESUMED':
+            self.state = "ready"
+
+        self.client.cache.apply(event_type, payload)
+
+        if event_type == 'GUILD_MEMBERS_CHUNK':
+            self.client.member_requests.handle_chunk(payload)
+
+        if event_type == 'INTERACTION_CREATE':
+            # Command handlers can run longer than a heartbeat interval, so they get their own task.
+            task = asyncio.create_task(self.handle_interaction(payload))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+        name = event_name(event_type)
+        if name in self.client.events:
+            await self.client.dispatch_event(name, build_event_payload(self.client, event_type, payload))
+
+    async def handle_interaction(self, payload: dict) -> None:
+        try:
+            await self.client.interaction_handler.handle_interaction(payload)
         except Exception as e:
-            self.logger.error(f"Error while processing WebSocket text message: {e}")
+            self.logger.error(f"Error while handling interaction: {e}")
 
     async def listen(self) -> None:
-        if not self.client.ws:
+        if not self.ws:
             return
 
-        async for msg in self.client.ws:
+        async for msg in self.ws:
             if msg.type == aiohttp.WSMsgType.TEXT:
                 await self.handle_text_message(msg)
             elif msg.type == aiohttp.WSMsgType.BINARY:
-                if self.progress:
-                    self.progress.console.log("[cyan]Received binary WebSocket message.[/cyan]")
-            elif msg.type == aiohttp.WSMsgType.PING:
-                if self.progress:
-                    self.progress.console.log("[cyan]Received WebSocket ping.[/cyan]")
-            elif msg.type == aiohttp.WSMsgType.PONG:
-                if self.progress:
-                    self.progress.console.log("[cyan]Received WebSocket pong.[/cyan]")
+                await self.handle_binary_message(msg)
+            elif msg.type in (aiohttp.WSMsgType.PING, aiohttp.WSMsgType.PONG):
+                trace = self.client.tracer.gateway
+                if trace:
+                    trace.debug("Received WebSocket %s", msg.type.name.lower(), shard=self.shard_id)
             elif msg.type == aiohttp.WSMsgType.CLOSED:
                 if self.progress:
                     self.progress.console.log("[cyan]WebSocket closed.[/cyan]")
@@ -251,11 +460,45 @@ class WebSocketManager:
                 self.logger.error(f"WebSocket error: {msg.data}")
                 break
 
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "latency": self.latency,
+            "latency_histogram": self.latency_histogram.summary(),
+            "sequence": self.sequence,
+            "reconnect_attempts": self.reconnect_attempts,
+            "send_queue": self.send_queue.stats(),
+        }
+
+    def restore_session(self, store) -> bool:
+        state = store.load(self.shard_id, self.total_shards)
+        if state is None:
+            return False
+        self.session_id = state["session_id"]
+        self.resume_gateway_url = state["resume_gateway_url"]
+        self.sequence = state["sequence"]
+        self.logger.info(f"Shard {self.shard_id}: Restored session {self.session_id} at sequence {self.sequence}.")
+        return True
+
+    def checkpoint_session(self, store) -> bool:
+        if not self.can_resume():
+            store.clear(self.shard_id)
+            return False
+        try:
+            store.save(self.shard_id, self.total_shards, self.session_id, self.resume_gateway_url, self.sequence)
+        except OSError as e:
+            self.logger.error(f"Shard {self.shard_id}: Failed to checkpoint session: {e}")
+            return False
+        return True
+
     def graceful_shutdown(self, signum, frame) -> None:
         if self.progress:
             self.progress.console.log("[cyan]Received shutdown signal. Closing WebSocket connection gracefully.[/cyan]")
         self.client.running = False
         if self.heartbeat_task and not self.heartbeat_task.done():
             self.heartbeat_task.cancel()
-        if self.client.ws:
-            asyncio.create_task(self.client.ws.close())
+
+        # A 1000/1001 close invalidates the session, so keep it resumable when it was checkpointed.
+        keep_session = self.client.session_store is not None and self.checkpoint_session(self.client.session_store)
+        if self.ws:
+            asyncio.create_task(self.ws.close(code=4000 if keep_session else 1000))
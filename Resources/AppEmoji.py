@@ -14,7 +14,7 @@ class AppEmojiManager:
     @classmethod
     async def list_application_emojis(cls, client):
         url = f"{client.base_url}/applications/{client.application_id}/emojis"
-        async with client.session.get(url, headers=cls.get_headers(client)) as response:
+        async with client.http.get(url, headers=cls.get_headers(client)) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -24,7 +24,7 @@ class AppEmojiManager:
     @classmethod
     async def get_application_emoji(cls, client, emoji_id):
         url = f"{client.base_url}/applications/{client.application_id}/emojis/{emoji_id}"
-        async with client.session.get(url, headers=cls.get_headers(client)) as response:
+        async with client.http.get(url, headers=cls.get_headers(client)) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -38,7 +38,7 @@ class AppEmojiManager:
             "name": name,
             "image": image_data
         }
-        async with client.session.post(url, headers=cls.get_headers(client), json=data) as response:
+        async with client.http.post(url, headers=cls.get_headers(client), json=data) as response:
             if response.status == 201:
                 return await response.json()
             else:
@@ -53,7 +53,7 @@ class AppEmojiManager:
             data["name"] = name
         if image_data:
             data["image"] = image_data
-        async with client.session.patch(url, headers=cls.get_headers(client), json=data) as response:
+        async with client.http.patch(url, headers=cls.get_headers(client), json=data) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -63,7 +63,7 @@ class AppEmojiManager:
     @classmethod
     async def delete_application_emoji(cls, client, emoji_id):
         url = f"{client.base_url}/applications/{client.application_id}/emojis/{emoji_id}"
-        async with client.session.delete(url, headers=cls.get_headers(client)) as response:
+        async with client.http.delete(url, headers=cls.get_headers(client)) as response:
             if response.status == 204:
                 print(f"Emoji {emoji_id} deleted successfully.")
                 return True
@@ -18,7 +18,7 @@ class Application:
         headers = {
             "Authorization": f"Bot {client.token}"
         }
-        async with client.session.get(url, headers=headers) as response:
+        async with client.http.get(url, headers=headers) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -28,7 +28,7 @@ class Application:
     @classmethod
     async def update_application(cls, client, **kwargs):
         url = f"{client.base_url}/applications/@me"
-        async with client.session.patch(url, headers=cls.get_headers(client), json=kwargs) as response:
+        async with client.http.patch(url, headers=cls.get_headers(client), json=kwargs) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -25,7 +25,7 @@ class AutoModerationManager:
             "exempt_channels": exempt_channels if exempt_channels else []
         }
         
-        async with client.session.post(url, headers=cls.get_headers(client), json=payload) as response:
+        async with client.http.post(url, headers=cls.get_headers(client), json=payload) as response:
             if response.status == 200 or response.status == 201:
                 rule = await response.json()
                 print(f"Successfully created rule: {rule}") 
@@ -37,7 +37,7 @@ class AutoModerationManager:
     @classmethod
     async def get_rules(cls, client, guild_id):
         url = f"{client.base_url}/guilds/{guild_id}/auto-moderation/rules"
-        async with client.session.get(url, headers=cls.get_headers(client)) as response:
+        async with client.http.get(url, headers=cls.get_headers(client)) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -47,7 +47,7 @@ class AutoModerationManager:
     @classmethod
     async def get_rule(cls, client, guild_id, rule_id):
         url = f"{client.base_url}/guilds/{guild_id}/auto-moderation/rules/{rule_id}"
-        async with client.session.get(url, headers=cls.get_headers(client)) as response:
+        async with client.http.get(url, headers=cls.get_headers(client)) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -65,7 +65,7 @@ class AutoModerationManager:
         if actions:
             data["actions"] = actions
 
-        async with client.session.patch(url, headers=cls.get_headers(client), json=data) as response:
+        async with client.http.patch(url, headers=cls.get_headers(client), json=data) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -75,7 +75,7 @@ class AutoModerationManager:
     @classmethod
     async def delete_rule(cls, client, guild_id, rule_id):
         url = f"{client.base_url}/guilds/{guild_id}/auto-moderation/rules/{rule_id}"
-        async with client.session.delete(url, headers=cls.get_headers(client)) as response:
+        async with client.http.delete(url, headers=cls.get_headers(client)) as response:
             if response.status == 204:
                 print(f"Rule {rule_id} deleted successfully.")
                 return True
@@ -1,4 +1,16 @@
 import aiohttp
+import time
+
+from ..Core.Pagination import Paginator
+
+DISCORD_EPOCH = 1420070400000
+BULK_DELETE_LIMIT = 100
+# Bulk delete rejects messages older than two weeks; keep a margin for clock skew.
+BULK_DELETE_MAX_AGE = 14 * 24 * 60 * 60 - 60
+
+
+def snowflake_time(snowflake):
+    return ((int(snowflake) >> 22) + DISCORD_EPOCH) / 1000
 
 class ChannelManager:
     @classmethod
@@ -9,15 +21,15 @@ class ChannelManager:
         }
 
     @classmethod
-    async def create_channel(cls, client, name, type_):
-        url = f"{client.base_url}/guilds/{client.get_guild_id()}/channels"
+    async def create_channel(cls, client, guild_id, name, type_):
+        url = f"{client.base_url}/guilds/{guild_id}/channels"
         headers = cls.get_headers(client)
         json_data = {
             "name": name,
             "type": type_
         }
 
-        async with client.session.post(url, headers=headers, json=json_data) as response:
+        async with client.http.post(url, headers=headers, json=json_data) as response:
             if response.status == 201:
                 return await response.json()
             else:
@@ -32,7 +44,7 @@ class ChannelManager:
             "name": new_name
         }
 
-        async with client.session.patch(url, headers=headers, json=json_data) as response:
+        async with client.http.patch(url, headers=headers, json=json_data) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -44,7 +56,7 @@ class ChannelManager:
         url = f"{client.base_url}/channels/{channel_id}"
         headers = cls.get_headers(client)
 
-        async with client.session.delete(url, headers=headers) as response:
+        async with client.http.delete(url, headers=headers) as response:
             if response.status == 204:
                 return {"status": "Channel deleted successfully"}
             else:
@@ -52,13 +64,72 @@ class ChannelManager:
                 return None
 
     @classmethod
-    async def list_channels(cls, client):
-        url = f"{client.base_url}/guilds/{client.get_guild_id()}/channels"
+    async def list_channels(cls, client, guild_id):
+        channels = client.cache.guild_channels(guild_id)
+        if channels is not None:
+            return [channel.to_dict() for channel in channels]
+
+        url = f"{client.base_url}/guilds/{guild_id}/channels"
         headers = cls.get_headers(client)
 
-        async with client.session.get(url, headers=headers) as response:
+        async with client.http.get(url, headers=headers) as response:
             if response.status == 200:
                 return await response.json()
             else:
                 print(f"Failed to list channels: {response.status} {await response.text()}")
                 return None
+
+    @classmethod
+    def history(cls, client, channel_id, limit=None, before=None, after=None):
+        url = f"{client.base_url}/channels/{channel_id}/messages"
+        if after is not None:
+            return Paginator(client, url, 100, direction="after", cursor=after, limit=limit)
+        return Paginator(client, url, 100, direction="before", cursor=before, limit=limit)
+
+    @classmethod
+    async def bulk_delete(cls, client, channel_id, message_ids, reason=None):
+        headers = cls.get_headers(client)
+        if reason:
+            headers["X-Audit-Log-Reason"] = reason
+
+        if len(message_ids) == 1:
+            url = f"{client.base_url}/channels/{channel_id}/messages/{message_ids[0]}"
+            async with client.http.delete(url, headers=headers) as response:
+                if response.status not in (204, 404):
+                    raise Exception(f"Error deleting message: {response.status} {await response.text()}")
+            return
+
+        url = f"{client.base_url}/channels/{channel_id}/messages/bulk-delete"
+        async with client.http.post(url, headers=headers, json={"messages": list(message_ids)}) as response:
+            if response.status != 204:
+                raise Exception(f"Error bulk deleting messages: {response.status} {await response.text()}")
+
+    @classmethod
+    async def purge(cls, client, channel_id, limit=100, check=None, before=None, after=None, reason=None):
+        cutoff = time.time() - BULK_DELETE_MAX_AGE
+        deleted = []
+        batch = []
+
+        async def flush():
+            if batch:
+                await cls.bulk_delete(client, channel_id, [message["id"] for message in batch], reason)
+                deleted.extend(batch)
+                batch.clear()
+
+        async for message in cls.history(client, channel_id, limit=limit, before=before, after=after):
+            if check is not None and not check(message):
+                continue
+
+            if snowflake_time(message["id"]) > cutoff:
+                batch.append(message)
+                if len(batch) == BULK_DELETE_LIMIT:
+                    await flush()
+                continue
+
+            # Too old for bulk delete: these go one by one through the route's rate-limit bucket.
+            await flush()
+            await cls.bulk_delete(client, channel_id, [message["id"]], reason)
+            deleted.append(message)
+
+        await flush()
+        return deleted
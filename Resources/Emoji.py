@@ -13,7 +13,7 @@ class EmojiManager:
         url = f"{client.base_url}/guilds/{guild_id}/emojis"
         headers = cls.get_headers(client)
 
-        async with client.session.get(url, headers=headers) as response:
+        async with client.http.get(url, headers=headers) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -29,7 +29,7 @@ class EmojiManager:
             "image": image_base64
         }
 
-        async with client.session.post(url, headers=headers, json=json_data) as response:
+        async with client.http.post(url, headers=headers, json=json_data) as response:
             if response.status == 201:
                 print(f"Successfully added emoji: {name}")
                 return await response.json()
@@ -47,7 +47,7 @@ class EmojiManager:
         if image_base64:
             json_data["image"] = image_base64
 
-        async with client.session.patch(url, headers=headers, json=json_data) as response:
+        async with client.http.patch(url, headers=headers, json=json_data) as response:
             if response.status == 200:
                 print(f"Successfully updated emoji: {emoji_id}")
                 return await response.json()
@@ -60,7 +60,7 @@ class EmojiManager:
         url = f"{client.base_url}/guilds/{guild_id}/emojis/{emoji_id}"
         headers = cls.get_headers(client)
 
-        async with client.session.delete(url, headers=headers) as response:
+        async with client.http.delete(url, headers=headers) as response:
             if response.status == 204:
                 print(f"Successfully deleted emoji: {emoji_id}")
             else:
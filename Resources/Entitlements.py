@@ -21,7 +21,7 @@ class EntitlementManager:
         url = f"{client.base_url}/entitlements"
         headers = cls.get_headers(client)
 
-        async with client.session.get(url, headers=headers, params=params) as response:
+        async with client.http.get(url, headers=headers, params=params) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -33,7 +33,7 @@ class EntitlementManager:
         url = f"{client.base_url}/entitlements/{entitlement_id}/consume"
         headers = cls.get_headers(client)
 
-        async with client.session.post(url, headers=headers) as response:
+        async with client.http.post(url, headers=headers) as response:
             if response.status == 204:
                 print(f"Entitlement {entitlement_id} consumed successfully.")
                 return True
@@ -52,7 +52,7 @@ class EntitlementManager:
             "guild_id": guild_id
         }
 
-        async with client.session.post(url, headers=headers, json=data) as response:
+        async with client.http.post(url, headers=headers, json=data) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -64,7 +64,7 @@ class EntitlementManager:
         url = f"{client.base_url}/entitlements/test-entitlements/{entitlement_id}"
         headers = cls.get_headers(client)
 
-        async with client.session.delete(url, headers=headers) as response:
+        async with client.http.delete(url, headers=headers) as response:
             if response.status == 204:
                 print(f"Test entitlement {entitlement_id} deleted successfully.")
                 return True
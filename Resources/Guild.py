@@ -1,5 +1,5 @@
-import aiohttp
-import asyncio
+from ..Core.Pagination import Paginator, user_id
+
 
 class Guild:
     def __init__(self, client, guild_id):
@@ -7,34 +7,50 @@ class Guild:
         self.guild_id = guild_id
 
     async def fetch_member(self, user_id):
-        url = f"{self.client.base_url}/members/{user_id}"
+        member = self.client.cache.get_member(self.guild_id, user_id)
+        if member is not None:
+            return member.to_dict()
+
+        url = f"{self.client.base_url}/guilds/{self.guild_id}/members/{user_id}"
         headers = {
             "Authorization": f"Bot {self.client.token}"
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    member_data = await response.json()
-                    return member_data
-                else:
-                    print(f"Failed to fetch member {user_id}: {response.status} - {await response.text()}")
-                    return None
+        async with self.client.http.get(url, headers=headers) as response:
+            if response.status == 200:
+                member_data = await response.json()
+                self.client.cache.add_member(self.guild_id, member_data)
+                return member_data
+            else:
+                print(f"Failed to fetch member {user_id}: {response.status} - {await response.text()}")
+                return None
 
     async def fetch_guild(self):
-        url = self.client.base_url
+        guild = self.client.cache.get_guild(self.guild_id)
+        if guild is not None and not guild.unavailable:
+            return guild.to_dict()
+
+        url = f"{self.client.base_url}/guilds/{self.guild_id}"
         headers = {
             "Authorization": f"Bot {self.client.token}"
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    guild_data = await response.json()
-                    return guild_data
-                else:
-                    print(f"Failed to fetch guild {self.guild_id}: {response.status} - {await response.text()}")
-                    return None
+        async with self.client.http.get(url, headers=headers) as response:
+            if response.status == 200:
+                guild_data = await response.json()
+                return guild_data
+            else:
+                print(f"Failed to fetch guild {self.guild_id}: {response.status} - {await response.text()}")
+                return None
+
+    def members(self, limit=None, after=None):
+        url = f"{self.client.base_url}/guilds/{self.guild_id}/members"
+        return Paginator(self.client, url, 1000, cursor=after, limit=limit, key=user_id)
+
+    def request_members(self, query=None, limit=0, user_ids=None, presences=False, cache=True, timeout=None):
+        return self.client.member_requests.stream(
+            self.guild_id, query, limit, user_ids, presences, cache, timeout
+        )
 
     def get_display_name(self, member_data):
         return member_data.get('nick') or member_data['user']['username']
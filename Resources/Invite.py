@@ -16,7 +16,7 @@ class InviteManager:
         }
 
         try:
-            async with client.session.post(url, headers=headers, json=payload) as response:
+            async with client.http.post(url, headers=headers, json=payload) as response:
                 if response.status == 200:
                     return await response.json()
                 else:
@@ -34,7 +34,7 @@ class InviteManager:
         }
 
         try:
-            async with client.session.delete(url, headers=headers) as response:
+            async with client.http.delete(url, headers=headers) as response:
                 if response.status == 204:
                     print(f"Invite {invite_code} deleted successfully.")
                     return True
@@ -53,7 +53,7 @@ class InviteManager:
         }
 
         try:
-            async with client.session.get(url, headers=headers) as response:
+            async with client.http.get(url, headers=headers) as response:
                 if response.status == 200:
                     return await response.json()
                 else:
@@ -71,7 +71,7 @@ class InviteManager:
         }
 
         try:
-            async with client.session.get(url, headers=headers) as response:
+            async with client.http.get(url, headers=headers) as response:
                 if response.status == 200:
                     return await response.json()
                 else:
@@ -1,51 +1,97 @@
 import aiohttp
 import sys
 
+EMPTY = ()
+
+COLLECTION_FIELDS = frozenset((
+    "mentions", "mention_roles", "mention_channels", "attachments", "embeds", "reactions",
+    "message_snapshots", "components", "sticker_items", "stickers"
+))
+FIELD_DEFAULTS = {"tts": False, "mention_everyone": False, "pinned": False, "type": 0}
+
+
+def payload_field(name):
+    default = FIELD_DEFAULTS.get(name)
+
+    def getter(self):
+        return self.raw.get(name, default)
+
+    def setter(self, value):
+        self.update({name: value})
+
+    return property(getter, setter)
+
+
+def collection_field(name):
+    def getter(self):
+        return self.raw.get(name) or EMPTY
+
+    def setter(self, value):
+        self.update({name: value})
+
+    return property(getter, setter)
+
+
 class Message:
-    def __init__(self, client, id, channel_id, author, content, timestamp, edited_timestamp=None, tts=False, 
-                 mention_everyone=False, mentions=None, mention_roles=None, mention_channels=None, 
-                 attachments=None, embeds=None, reactions=None, nonce=None, pinned=False, 
-                 webhook_id=None, type=0, activity=None, application=None, application_id=None, 
-                 flags=None, message_reference=None, message_snapshots=None, referenced_message=None, 
-                 interaction_metadata=None, interaction=None, thread=None, components=None, 
-                 sticker_items=None, stickers=None, position=None, role_subscription_data=None, 
+    __slots__ = ("client", "raw", "_referenced_message")
+
+    FIELDS = (
+        "id", "channel_id", "author", "content", "timestamp", "edited_timestamp", "tts",
+        "mention_everyone", "mentions", "mention_roles", "mention_channels", "attachments",
+        "embeds", "reactions", "nonce", "pinned", "webhook_id", "type", "activity",
+        "application", "application_id", "flags", "message_reference", "message_snapshots",
+        "referenced_message", "interaction_metadata", "interaction", "thread", "components",
+        "sticker_items", "stickers", "position", "role_subscription_data", "resolved", "call"
+    )
+    PAYLOAD_FIELDS = frozenset(FIELDS)
+
+    def __init__(self, client, id=None, channel_id=None, author=None, content=None, timestamp=None,
+                 edited_timestamp=None, tts=False, mention_everyone=False, mentions=None, mention_roles=None,
+                 mention_channels=None, attachments=None, embeds=None, reactions=None, nonce=None, pinned=False,
+                 webhook_id=None, type=0, activity=None, application=None, application_id=None,
+                 flags=None, message_reference=None, message_snapshots=None, referenced_message=None,
+                 interaction_metadata=None, interaction=None, thread=None, components=None,
+                 sticker_items=None, stickers=None, position=None, role_subscription_data=None,
                  resolved=None, call=None):
+        values = locals()
         self.client = client
-        self.id = id
-        self.channel_id = channel_id
-        self.author = author
-        self.content = content
-        self.timestamp = timestamp
-        self.edited_timestamp = edited_timestamp
-        self.tts = tts
-        self.mention_everyone = mention_everyone
-        self.mentions = mentions if mentions is not None else []
-        self.mention_roles = mention_roles if mention_roles is not None else []
-        self.mention_channels = mention_channels if mention_channels is not None else []
-        self.attachments = attachments if attachments is not None else []
-        self.embeds = embeds if embeds is not None else []
-        self.reactions = reactions if reactions is not None else []
-        self.nonce = nonce
-        self.pinned = pinned
-        self.webhook_id = webhook_id
-        self.type = type
-        self.activity = activity
-        self.application = application
-        self.application_id = application_id
-        self.flags = flags
-        self.message_reference = message_reference
-        self.message_snapshots = message_snapshots if message_snapshots is not None else []
-        self.referenced_message = referenced_message
-        self.interaction_metadata = interaction_metadata
-        self.interaction = interaction
-        self.thread = thread
-        self.components = components if components is not None else []
-        self.sticker_items = sticker_items if sticker_items is not None else []
-        self.stickers = stickers if stickers is not None else []
-        self.position = position
-        self.role_subscription_data = role_subscription_data
-        self.resolved = resolved
-        self.call = call
+        self.raw = {field: values[field] for field in self.FIELDS if values[field] is not None}
+        self._referenced_message = None
+
+    @classmethod
+    def from_payload(cls, client, data):
+        # The payload is kept as-is; fields are read from it on access.
+        message = cls.__new__(cls)
+        message.client = client
+        message.raw = data
+        message._referenced_message = None
+        return message
+
+    @property
+    def referenced_message(self):
+        if self._referenced_message is None:
+            data = self.raw.get("referenced_message")
+            if data is not None:
+                self._referenced_message = Message.from_payload(self.client, data)
+        return self._referenced_message
+
+    @referenced_message.setter
+    def referenced_message(self, value):
+        self.update({"referenced_message": value.raw if isinstance(value, Message) else value})
+
+    def update(self, data):
+        # Copy-on-write, so copies taken before an edit keep the old payload.
+        changes = {key: value for key, value in data.items() if key in self.PAYLOAD_FIELDS}
+        if changes:
+            self.raw = {**self.raw, **changes}
+            if "referenced_message" in changes:
+                self._referenced_message = None
+
+    def to_dict(self):
+        return dict(self.raw)
+
+    def __repr__(self):
+        return f"<Message id={self.id} channel_id={self.channel_id}>"
 
     @classmethod
     def get_headers(cls, client):
@@ -58,7 +104,7 @@ class Message:
     async def get_message(cls, client, channel_id, message_id):
         url = f"{client.base_url}/channels/{channel_id}/messages/{message_id}"
         headers = cls.get_headers(client)
-        async with client.session.get(url, headers=headers) as response:
+        async with client.http.get(url, headers=headers) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -74,7 +120,7 @@ class Message:
             "embeds": embeds or [],
             "allowed_mentions": allowed_mentions or {}
         }
-        async with client.session.post(url, headers=headers, json=data) as response:
+        async with client.http.post(url, headers=headers, json=data) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -89,7 +135,7 @@ class Message:
             "embeds": embeds or [],
             "allowed_mentions": allowed_mentions or {}
         }
-        async with client.session.patch(url, headers=headers, json=data) as response:
+        async with client.http.patch(url, headers=headers, json=data) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -99,7 +145,7 @@ class Message:
     async def delete_message(cls, client, channel_id, message_id):
         url = f"{client.base_url}/channels/{channel_id}/messages/{message_id}"
         headers = cls.get_headers(client)
-        async with client.session.delete(url, headers=headers) as response:
+        async with client.http.delete(url, headers=headers) as response:
             if response.status == 204:
                 print(f"Message {message_id} deleted.")
             else:
@@ -107,9 +153,13 @@ class Message:
 
     @classmethod
     async def get_message(cls, client, channel_id, message_id):
+        message = client.cache.messages.get(message_id)
+        if message is not None:
+            return message.to_dict()
+
         url = f"{client.base_url}/channels/{channel_id}/messages/{message_id}"
         headers = cls.get_headers(client)
-        async with client.session.get(url, headers=headers) as response:
+        async with client.http.get(url, headers=headers) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -119,7 +169,7 @@ class Message:
     async def add_reaction(cls, client, channel_id, message_id, emoji):
         url = f"{client.base_url}/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me"
         headers = cls.get_headers(client)
-        async with client.session.put(url, headers=headers) as response:
+        async with client.http.put(url, headers=headers) as response:
             if response.status == 204:
                 print(f"Reaction {emoji} added to message {message_id}.")
             else:
@@ -129,7 +179,7 @@ class Message:
     async def remove_reaction(cls, client, channel_id, message_id, emoji):
         url = f"{client.base_url}/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me"
         headers = cls.get_headers(client)
-        async with client.session.delete(url, headers=headers) as response:
+        async with client.http.delete(url, headers=headers) as response:
             if response.status == 204:
                 print(f"Reaction {emoji} removed from message {message_id}.")
             else:
@@ -139,7 +189,7 @@ class Message:
     async def remove_all_reactions(cls, client, channel_id, message_id):
         url = f"{client.base_url}/channels/{channel_id}/messages/{message_id}/reactions"
         headers = cls.get_headers(client)
-        async with client.session.delete(url, headers=headers) as response:
+        async with client.http.delete(url, headers=headers) as response:
             if response.status == 204:
                 print(f"All reactions removed from message {message_id}.")
             else:
@@ -149,7 +199,7 @@ class Message:
     async def pin_message(cls, client, channel_id, message_id):
         url = f"{client.base_url}/channels/{channel_id}/pins/{message_id}"
         headers = cls.get_headers(client)
-        async with client.session.put(url, headers=headers) as response:
+        async with client.http.put(url, headers=headers) as response:
             if response.status == 204:
                 print(f"Message {message_id} pinned.")
             else:
@@ -159,7 +209,7 @@ class Message:
     async def unpin_message(cls, client, channel_id, message_id):
         url = f"{client.base_url}/channels/{channel_id}/pins/{message_id}"
         headers = cls.get_headers(client)
-        async with client.session.delete(url, headers=headers) as response:
+        async with client.http.delete(url, headers=headers) as response:
             if response.status == 204:
                 print(f"Message {message_id} unpinned.")
             else:
@@ -169,11 +219,13 @@ class Message:
     async def crosspost_message(cls, client, channel_id, message_id):
         url = f"{client.base_url}/channels/{channel_id}/messages/{message_id}/crosspost"
         headers = cls.get_headers(client)
-        async with client.session.post(url, headers=headers) as response:
+        async with client.http.post(url, headers=headers) as response:
             if response.status == 200:
                 return await response.json()
             else:
                 raise Exception(f"Error crossposting message: {response.status} {await response.text()}")
-            
-            
-    
+
+
+for _field in Message.PAYLOAD_FIELDS - {"referenced_message"}:
+    setattr(Message, _field, collection_field(_field) if _field in COLLECTION_FIELDS else payload_field(_field))
+del _field
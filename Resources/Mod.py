@@ -1,6 +1,8 @@
 import datetime
 import aiohttp
 
+from ..Core.Pagination import Paginator, user_id
+
 class ModerationManager:
     @classmethod
     async def ban(cls, client, guild_id, member_id, reason=None):
@@ -12,7 +14,7 @@ class ModerationManager:
         json_data = {"reason": reason} if reason else {}
 
         try:
-            async with client.session.put(url, headers=headers, json=json_data) as response:
+            async with client.http.put(url, headers=headers, json=json_data) as response:
                 if response.status != 204: 
                     text = await response.text()
                     print(f"Failed to ban user: {response.status} {text}")
@@ -32,7 +34,7 @@ class ModerationManager:
         json_data = {"reason": reason} if reason else {}
 
         try:
-            async with client.session.delete(url, headers=headers, json=json_data) as response:
+            async with client.http.delete(url, headers=headers, json=json_data) as response:
                 if response.status != 204:
                     text = await response.text()
                     print(f"Failed to kick user: {response.status} {text}")
@@ -56,7 +58,7 @@ class ModerationManager:
             json_data["reason"] = reason
 
         try:
-            async with client.session.patch(url, headers=headers, json=json_data) as response:
+            async with client.http.patch(url, headers=headers, json=json_data) as response:
                 if response.status != 200:
                     text = await response.text()
                     print(f"Failed to timeout user: {response.status} {text}")
@@ -65,3 +67,8 @@ class ModerationManager:
         except aiohttp.ClientError as err:
             print(f"An error occurred while timing out: {err}")
             return None
+
+    @classmethod
+    def bans(cls, client, guild_id, limit=None, after=None):
+        url = f"{client.base_url}/guilds/{guild_id}/bans"
+        return Paginator(client, url, 1000, cursor=after, limit=limit, key=user_id)
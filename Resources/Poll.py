@@ -1,4 +1,5 @@
-import aiohttp
+from ..Core.Pagination import Paginator
+
 
 class PollManager:
     def __init__(self, client):
@@ -26,13 +27,12 @@ class PollManager:
         if duration:
             data["poll"]["duration"] = duration * 3600
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=self.get_headers(), json=data) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    print(f"Failed to create poll: {response.status} - {await response.text()}")
-                    return None
+        async with self.client.http.post(url, headers=self.get_headers(), json=data) as response:
+            if response.status == 200:
+                return await response.json()
+            else:
+                print(f"Failed to create poll: {response.status} - {await response.text()}")
+                return None
 
     async def get_answer_voters(self, channel_id, message_id, answer_id, limit=25, after=None):
         url = f"{self.base_url}/{channel_id}/polls/{message_id}/answers/{answer_id}"
@@ -42,44 +42,46 @@ class PollManager:
         if after:
             params["after"] = after
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=self.get_headers(), params=params) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    print(f"Failed to retrieve answer voters: {response.status} - {await response.text()}")
-                    return None
+        async with self.client.http.get(url, headers=self.get_headers(), params=params) as response:
+            if response.status == 200:
+                return await response.json()
+            else:
+                print(f"Failed to retrieve answer voters: {response.status} - {await response.text()}")
+                return None
+
+    def iter_answer_voters(self, channel_id, message_id, answer_id, limit=None, after=None):
+        url = f"{self.base_url}/{channel_id}/polls/{message_id}/answers/{answer_id}"
+        return Paginator(
+            self.client, url, 100, cursor=after, limit=limit, extract=lambda data: data.get("users", [])
+        )
 
     async def end_poll(self, channel_id, message_id):
         url = f"{self.base_url}/{channel_id}/polls/{message_id}/expire"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=self.get_headers()) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    print(f"Failed to end poll: {response.status} - {await response.text()}")
-                    return None
+        async with self.client.http.post(url, headers=self.get_headers()) as response:
+            if response.status == 200:
+                return await response.json()
+            else:
+                print(f"Failed to end poll: {response.status} - {await response.text()}")
+                return None
 
     async def get_poll_results(self, channel_id, message_id):
         url = f"{self.base_url}/{channel_id}/polls/{message_id}"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=self.get_headers()) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    print(f"Failed to retrieve poll results: {response.status} - {await response.text()}")
-                    return None
+        async with self.client.http.get(url, headers=self.get_headers()) as response:
+            if response.status == 200:
+                return await response.json()
+            else:
+                print(f"Failed to retrieve poll results: {response.status} - {await response.text()}")
+                return None
 
     async def delete_poll(self, channel_id, message_id):
         url = f"{self.base_url}/{channel_id}/polls/{message_id}"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.delete(url, headers=self.get_headers()) as response:
-                if response.status == 204:
-                    print(f"Poll {message_id} deleted successfully.")
-                    return True
-                else:
-                    print(f"Failed to delete poll: {response.status} - {await response.text()}")
-                    return False
+        async with self.client.http.delete(url, headers=self.get_headers()) as response:
+            if response.status == 204:
+                print(f"Poll {message_id} deleted successfully.")
+                return True
+            else:
+                print(f"Failed to delete poll: {response.status} - {await response.text()}")
+                return False
@@ -16,7 +16,7 @@ class StickerSender:
             "sticker_ids": [sticker_id]
         }
 
-        async with client.session.post(url, headers=headers, json=payload) as response:
+        async with client.http.post(url, headers=headers, json=payload) as response:
             if response.status == 200:
                 print("Sticker sent successfully!")
             else:
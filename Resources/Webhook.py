@@ -1,5 +1,3 @@
-import aiohttp
-
 class WebhookManager:
     @classmethod
     def get_headers(cls, client):
@@ -16,7 +14,7 @@ class WebhookManager:
             "name": name,
             "avatar": avatar
         }
-        async with client.session.post(url, headers=headers, json=data) as response:
+        async with client.http.post(url, headers=headers, json=data) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -34,7 +32,7 @@ class WebhookManager:
         if channel_id:
             data["channel_id"] = channel_id
 
-        async with client.session.patch(url, headers=headers, json=data) as response:
+        async with client.http.patch(url, headers=headers, json=data) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -44,7 +42,7 @@ class WebhookManager:
     async def get_webhook(cls, client, webhook_id):
         url = f"{client.base_url}/webhooks/{webhook_id}"
         headers = cls.get_headers(client)
-        async with client.session.get(url, headers=headers) as response:
+        async with client.http.get(url, headers=headers) as response:
             if response.status == 200:
                 return await response.json()
             else:
@@ -54,7 +52,7 @@ class WebhookManager:
     async def delete_webhook(cls, client, webhook_id):
         url = f"{client.base_url}/webhooks/{webhook_id}"
         headers = cls.get_headers(client)
-        async with client.session.delete(url, headers=headers) as response:
+        async with client.http.delete(url, headers=headers) as response:
             if response.status == 204:
                 print(f"Webhook {webhook_id} deleted successfully.")
             else:
@@ -70,9 +68,8 @@ class WebhookManager:
             "username": username,
             "avatar_url": avatar_url
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=data) as response:
-                if response.status in (200, 204):
-                    print("Message sent successfully.")
-                else:
-                    raise Exception(f"Failed to send message: {response.status} - {await response.text()}")
+        async with client.http.post(url, headers=headers, json=data) as response:
+            if response.status in (200, 204):
+                print("Message sent successfully.")
+            else:
+                raise Exception(f"Failed to send message: {response.status} - {await response.text()}")